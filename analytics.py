@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Replay analytics for the Galaxian game
+
+Re-simulates a directory of recorded sessions headlessly across a process
+pool and streams one row of metrics per session to a Parquet file (with
+pyarrow installed) or a CSV file:
+
+    python analytics.py replays/ --output sessions.parquet
+
+Only a bounded number of replays is in flight at once and rows are written
+in fixed-size batches, so memory use does not grow with the number of
+replays.
+"""
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; CSV output needs nothing extra
+    pa = pq = None
+
+from replay import Replay, ReplayError, INPUTS
+
+REPLAY_EXTENSION = '.gxr'
+
+# Output columns, in order; list columns hold one value per sample or level
+COLUMNS = (
+    'path', 'seed', 'ticks', 'score', 'level_reached', 'lives', 'game_over',
+    'bullet_kills', 'rocket_kills', 'shield_kills', 'shield_pickups', 'rocket_pickups',
+    'deaths_per_level', 'score_over_time', 'error'
+)
+LIST_COLUMNS = ('deaths_per_level', 'score_over_time')
+
+def find_replays(directory):
+    """Yield replay paths under a directory, one at a time"""
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.endswith(REPLAY_EXTENSION):
+                yield os.path.join(root, name)
+
+def analyze_replay(path, sample_ticks=600):
+    """
+    Re-simulate one replay and collect its metrics
+
+    Args:
+        path (str): Replay file
+        sample_ticks (int): Ticks between score_over_time samples
+
+    Returns:
+        dict: One value per name in COLUMNS. error is None on success; on
+            failure it holds the message and the metrics are empty.
+    """
+    row = dict.fromkeys(COLUMNS)
+    row.update(path=path, deaths_per_level=[], score_over_time=[])
+    try:
+        replay = Replay.load(path)
+    except (OSError, ReplayError) as e:
+        row['error'] = str(e)
+        return row
+
+    try:
+        # Particles are only drawn, so a headless replay does not need them
+        simulation = replay.simulation(particles=False)
+        state = simulation.state
+        step = simulation.step
+        score_over_time = []
+        inputs = replay.inputs
+        for start in range(0, len(inputs), sample_ticks):
+            for mask in inputs[start:start + sample_ticks]:
+                step(INPUTS[mask])
+            score_over_time.append(state.score)
+        simulation.close()
+    except Exception as e:
+        # One replay that cannot be re-simulated (say, a swarm recording on
+        # a worker without numpy) must not stop the whole run
+        row['error'] = f"{type(e).__name__}: {e}"
+        return row
+
+    stats = simulation.stats
+    row.update(
+        seed=replay.seed,
+        ticks=len(replay),
+        score=state.score,
+        level_reached=state.level,
+        lives=state.lives,
+        game_over=state.game_over,
+        bullet_kills=stats.bullet_kills,
+        rocket_kills=stats.rocket_kills,
+        shield_kills=stats.shield_kills,
+        shield_pickups=stats.shield_pickups,
+        rocket_pickups=stats.rocket_pickups,
+        deaths_per_level=[stats.deaths.get(level, 0) for level in range(replay.level, state.level + 1)],
+        score_over_time=score_over_time
+    )
+    return row
+
+
+class CsvSink:
+    """Writes rows to a CSV file; list columns are joined with spaces"""
+    def __init__(self, path):
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(COLUMNS)
+
+    def write(self, rows):
+        for row in rows:
+            values = []
+            for name in COLUMNS:
+                value = row[name]
+                if name in LIST_COLUMNS:
+                    value = ' '.join(map(str, value))
+                values.append('' if value is None else value)
+            self._writer.writerow(values)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink:
+    """Writes each batch of rows as one row group of a Parquet file"""
+    def __init__(self, path):
+        if pa is None:
+            raise ImportError("Parquet output requires pyarrow")
+        self.schema = pa.schema([
+            ('path', pa.string()), ('seed', pa.uint64()), ('ticks', pa.int64()),
+            ('score', pa.int64()), ('level_reached', pa.int32()), ('lives', pa.int32()),
+            ('game_over', pa.bool_()), ('bullet_kills', pa.int32()), ('rocket_kills', pa.int32()),
+            ('shield_kills', pa.int32()), ('shield_pickups', pa.int32()),
+            ('rocket_pickups', pa.int32()), ('deaths_per_level', pa.list_(pa.int32())),
+            ('score_over_time', pa.list_(pa.int64())), ('error', pa.string())
+        ])
+        self._writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        columns = {name: [row[name] for row in rows] for name in COLUMNS}
+        self._writer.write_table(pa.table(columns, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+def open_sink(path):
+    """Parquet sink for .parquet paths, CSV sink otherwise"""
+    if path.endswith('.parquet'):
+        return ParquetSink(path)
+    return CsvSink(path)
+
+def run(paths, sink, workers=None, batch_size=256, sample_ticks=600, progress=None):
+    """
+    Analyze replays across a process pool, streaming rows to a sink
+
+    At most a few replays per worker are queued at a time and rows are
+    handed to the sink batch_size at a time, so memory stays flat.
+
+    Args:
+        paths (iterable): Replay paths; consumed lazily
+        sink: Object with write(rows), such as CsvSink or ParquetSink
+        workers (int, optional): Worker processes (default: one per CPU)
+        batch_size (int): Rows per sink write
+        sample_ticks (int): Ticks between score_over_time samples
+        progress (callable, optional): Called with (replays done, seconds)
+            after every batch
+
+    Returns:
+        tuple: (replays analyzed, seconds taken)
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 4
+    paths = iter(paths)
+    pending = set()
+    batch = []
+    done = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            for path in paths:
+                pending.add(pool.submit(analyze_replay, path, sample_ticks))
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                batch.append(future.result())
+            if len(batch) >= batch_size:
+                sink.write(batch)
+                done += len(batch)
+                batch = []
+                if progress is not None:
+                    progress(done, time.perf_counter() - start)
+    if batch:
+        sink.write(batch)
+        done += len(batch)
+    return done, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('directory', help='directory searched recursively for *.gxr replays')
+    parser.add_argument('--output', default='sessions.csv',
+                        help='output file; .parquet writes Parquet (needs pyarrow), anything else CSV')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--batch-size', type=int, default=256, help='rows per write')
+    parser.add_argument('--sample-ticks', type=int, default=600,
+                        help='ticks between score_over_time samples')
+    args = parser.parse_args(argv)
+
+    def progress(done, seconds):
+        print(f"{done} replays, {done / seconds:.1f} replays/s")
+
+    sink = open_sink(args.output)
+    try:
+        done, seconds = run(find_replays(args.directory), sink, args.workers, args.batch_size,
+                            args.sample_ticks, progress)
+    finally:
+        sink.close()
+    print(f"Analyzed {done} replays in {seconds:.1f} s "
+          f"({done / seconds if seconds else 0:.1f} replays/s), written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ import pygame
 import os
 import sys
 import random
+import json
 
 def create_player_ship():
     """Create a more detailed player ship image"""
@@ -184,30 +185,19 @@ def create_background():
 
 def create_power_ups():
     """Create power-up images"""
-    # Shield power-up
+    # Shield power-up: blue shield icon
     shield_img = pygame.Surface((30, 30), pygame.SRCALPHA)
-    # Draw shield icon
-    pygame.draw.circle(shield_img, (0, 100, 255, 180), (15, 15), 14)
-    pygame.draw.circle(shield_img, (100, 200, 255, 150), (15, 15), 10)
-    pygame.draw.circle(shield_img, (150, 220, 255, 120), (15, 15), 6)
-    # Add a glow effect
-    for r in range(16, 20):
-        pygame.draw.circle(shield_img, (0, 100, 255, 10), (15, 15), r)
-    
-    # Rocket power-up
+    pygame.draw.circle(shield_img, (0, 100, 255), (15, 15), 15)
+    pygame.draw.circle(shield_img, (100, 200, 255), (15, 15), 10)
+    pygame.draw.circle(shield_img, (200, 230, 255), (15, 15), 5)
+    
+    # Rocket power-up: red rocket icon
     rocket_img = pygame.Surface((30, 30), pygame.SRCALPHA)
-    # Draw rocket body
-    pygame.draw.rect(rocket_img, (220, 20, 60), (12, 5, 6, 15))
-    pygame.draw.polygon(rocket_img, (220, 20, 60), [(12, 5), (15, 0), (18, 5)])
-    # Draw fins
-    pygame.draw.polygon(rocket_img, (169, 169, 169), [(10, 15), (12, 15), (12, 20)])
-    pygame.draw.polygon(rocket_img, (169, 169, 169), [(18, 15), (20, 15), (18, 20)])
-    # Draw flame
-    pygame.draw.polygon(rocket_img, (255, 165, 0), [(12, 20), (15, 25), (18, 20)])
-    pygame.draw.polygon(rocket_img, (255, 215, 0), [(13, 20), (15, 23), (17, 20)])
-    # Add a glow effect
-    for r in range(16, 20):
-        pygame.draw.circle(rocket_img, (255, 100, 0, 10), (15, 15), r)
+    pygame.draw.rect(rocket_img, (255, 50, 50), (10, 5, 10, 20))
+    pygame.draw.polygon(rocket_img, (255, 100, 50), [(10, 5), (15, 0), (20, 5)])
+    pygame.draw.rect(rocket_img, (150, 150, 150), (8, 25, 14, 5))
+    # Add flame effect
+    pygame.draw.polygon(rocket_img, (255, 215, 0), [(12, 25), (15, 30), (18, 25)])
     
     # Actual rocket projectile
     rocket = pygame.Surface((10, 30), pygame.SRCALPHA)
@@ -227,15 +217,54 @@ def create_shield_effect():
     """Create shield effect for player"""
     shield = pygame.Surface((70, 60), pygame.SRCALPHA)
     
-    # Draw shield bubble
-    pygame.draw.ellipse(shield, (0, 100, 255, 80), (0, 0, 70, 60))
-    pygame.draw.ellipse(shield, (100, 200, 255, 40), (5, 5, 60, 50))
+    # Draw shield bubble with bright blue color
+    pygame.draw.ellipse(shield, (0, 150, 255, 120), (0, 0, 70, 60))
+    pygame.draw.ellipse(shield, (100, 200, 255, 80), (5, 5, 60, 50))
     
     # Add highlight
-    pygame.draw.arc(shield, (255, 255, 255, 100), (5, 5, 60, 50), 0.5, 2.5, 3)
+    pygame.draw.arc(shield, (255, 255, 255, 150), (5, 5, 60, 50), 0.5, 2.5, 3)
     
     return shield
 
+def pack_atlas(sprites, max_width=512, padding=1):
+    """
+    Pack named sprites into a single texture atlas
+    
+    Sprites are placed on shelves, tallest first, so rows waste little space.
+    
+    Args:
+        sprites (dict): Sprite name to pygame.Surface
+        max_width (int): Width of the atlas in pixels
+        padding (int): Empty pixels kept around each sprite
+        
+    Returns:
+        tuple: (atlas surface, dict of sprite name to [x, y, width, height])
+    """
+    order = sorted(sprites, key=lambda name: (-sprites[name].get_height(), name))
+    index = {}
+    x = y = shelf_height = 0
+    for name in order:
+        width, height = sprites[name].get_size()
+        if x + width + padding > max_width:
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+        index[name] = [x + padding, y + padding, width, height]
+        x += width + padding
+        shelf_height = max(shelf_height, height + padding)
+    
+    atlas = pygame.Surface((max_width, y + shelf_height + padding), pygame.SRCALPHA)
+    for name, (x, y, _, _) in index.items():
+        atlas.blit(sprites[name], (x, y))
+    return atlas, index
+
+def save_atlas(sprites, image_path='assets/atlas.png', index_path='assets/atlas.json'):
+    """Pack sprites and write the atlas image and its JSON index of rects"""
+    atlas, index = pack_atlas(sprites)
+    pygame.image.save(atlas, image_path)
+    with open(index_path, 'w') as f:
+        json.dump({'image': os.path.basename(image_path), 'sprites': index}, f, indent=2, sort_keys=True)
+
 def create_laser_sound():
     """Create a simple laser sound effect"""
     pygame.mixer.init()
@@ -265,9 +294,11 @@ def main():
     pygame.image.save(player_ship, 'assets/player_ship.png')
     
     # Create and save enemy ships
+    enemy_ships = []
     for i in range(3):
         enemy_ship = create_enemy_ship(i)
         pygame.image.save(enemy_ship, f'assets/enemy{i+1}.png')
+        enemy_ships.append(enemy_ship)
     
     # Create and save background
     background = create_background()
@@ -283,6 +314,19 @@ def main():
     shield_effect = create_shield_effect()
     pygame.image.save(shield_effect, 'assets/shield_effect.png')
     
+    # Pack every sprite the game loads by name into one atlas so it decodes
+    # a single file
+    sprites = {
+        'player_ship': player_ship,
+        'shield_powerup': shield_powerup,
+        'rocket_powerup': rocket_powerup,
+        'rocket': rocket,
+        'shield_effect': shield_effect
+    }
+    for i, enemy_ship in enumerate(enemy_ships):
+        sprites[f'enemy{i+1}'] = enemy_ship
+    save_atlas(sprites)
+    
     # Create and save sound effects
     laser_sound = create_laser_sound()
     explosion_sound = create_explosion_sound()
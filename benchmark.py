@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Scenario benchmarks for the Galaxian game
+
+Runs scripted worst-case scenarios headlessly and reports per-phase timing
+percentiles and sprites processed per second. Results are written as JSON
+so that runs on different commits can be compared:
+
+    python benchmark.py --output before.json
+    python benchmark.py --output after.json --compare before.json
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+import pygame
+
+from bullet import bullet_pool
+from powerup import Rocket
+from simulation import Simulation, Inputs
+from renderer import Renderer, BatchRenderer, draw_world
+
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+
+class PhaseRecorder:
+    """Collects timing samples per phase (the Simulation.timer interface)"""
+    def __init__(self):
+        self.samples = {}
+
+    def record(self, phase, seconds):
+        self.samples.setdefault(phase, []).append(seconds)
+
+    def summary(self):
+        """Return mean and p50/p95/p99 in microseconds for each phase"""
+        return {phase: summarize(samples) for phase, samples in self.samples.items()}
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        'mean_us': sum(ordered) / len(ordered) * 1e6,
+        'p50_us': percentile(ordered, 0.50) * 1e6,
+        'p95_us': percentile(ordered, 0.95) * 1e6,
+        'p99_us': percentile(ordered, 0.99) * 1e6
+    }
+
+
+# Scenarios: name -> (starting level, setup(sim, rng), per-tick hook(sim, rng),
+# extra Simulation keyword arguments)
+
+def _immortal(sim, rng):
+    sim.state.lives = 10 ** 9
+
+def _top_up_enemy_bullets(sim, rng, count=200):
+    while len(sim.enemy_bullets) < count:
+        bullet = bullet_pool.acquire(rng.randint(0, SCREEN_WIDTH), rng.randint(0, SCREEN_HEIGHT), 5)
+        sim.all_sprites.add(bullet)
+        sim.enemy_bullets.add(bullet)
+
+def _rocket_into_formation(sim, rng):
+    if not sim.rockets and sim.enemies:
+        target = rng.choice(sim.enemies.sprites())
+        rocket = Rocket(target.rect.centerx, target.rect.bottom + 20)
+        sim.all_sprites.add(rocket)
+        sim.rockets.add(rocket)
+
+def _top_up_explosions(sim, rng, count=50):
+    while len(sim.explosions) < count:
+        sim._explosion((rng.randint(0, SCREEN_WIDTH), rng.randint(0, SCREEN_HEIGHT)))
+
+def _keep_shield(sim, rng):
+    if not sim.player.is_shielded():
+        sim.player.activate_shield()
+
+# The largest fleet of the original fixed grid (6 rows of 10), pinned so the
+# workload does not depend on the seed or on LevelGenerator's formation pick
+MAX_FLEET_FORMATION = {
+    'type': 'standard_grid',
+    'rows': 6,
+    'cols': 10,
+    'spacing_x': 60,
+    'spacing_y': 50,
+    'offset_x': 100,
+    'offset_y': 50
+}
+
+SCENARIOS = {
+    'max_fleet': (12, _immortal, None, {'formation': MAX_FLEET_FORMATION}),
+    'enemy_bullets_200': (1, _immortal, _top_up_enemy_bullets, {}),
+    'rocket_vs_formation': (12, _immortal, _rocket_into_formation, {'formation': MAX_FLEET_FORMATION}),
+    'explosions_50': (1, _immortal, _top_up_explosions, {}),
+    'shield_always_on': (8, _immortal, _keep_shield, {}),
+    'swarm_1000': (1, _immortal, None, {'swarm': 1000}),
+    'swarm_5000': (1, _immortal, None, {'swarm': 5000}),
+}
+
+def run_scenario(name, ticks, seed, renderer, fleet_backend='sprites', prefetch=False):
+    """
+    Run one scenario and return its timing summary
+
+    Args:
+        name (str): Key into SCENARIOS
+        ticks (int): Number of simulation ticks to time
+        seed (int): Seed for the simulation and the scenario script
+        renderer (Renderer): Renderer for the draw pass; the frame is
+            drawn but never flipped
+        fleet_backend (str): Enemy movement backend, 'sprites' or 'numpy'
+        prefetch (bool): Build each next level's fleet on a worker thread
+
+    Returns:
+        dict: Per-phase percentiles, totals and throughput
+    """
+    level, setup, hook, options = SCENARIOS[name]
+    rng = random.Random(seed)
+    sim = Simulation(SCREEN_WIDTH, SCREEN_HEIGHT, level=level, seed=seed, fleet_backend=fleet_backend,
+                     prefetch=prefetch, **options)
+    recorder = PhaseRecorder()
+    sim.timer = recorder
+    setup(sim, rng)
+    allocated = bullet_pool.allocated
+
+    sprites = 0
+    tick_times = []
+    for tick in range(ticks):
+        start = time.perf_counter()
+        if hook:
+            hook(sim, rng)
+        sim.step(Inputs(fire=tick % 10 == 0))
+
+        draw_start = time.perf_counter()
+        renderer.begin()
+        draw_world(renderer, sim)
+        renderer.flush()
+        end = time.perf_counter()
+        recorder.record('draw', end - draw_start)
+        tick_times.append(end - start)
+        sprites += len(sim.all_sprites) + (len(sim.enemies) if sim.swarm else 0)
+        if sim.particles is not None:
+            # Particle explosions are not in all_sprites; count each one and
+            # its live particles
+            sprites += len(sim.explosions) + sim.particles.count
+
+    sim.close()
+
+    total = sum(tick_times)
+    return {
+        'ticks': ticks,
+        'total_s': total,
+        'tick': summarize(tick_times),
+        'phases': recorder.summary(),
+        'mean_sprites': sprites / ticks,
+        'bullets_allocated': bullet_pool.allocated - allocated,
+        'sprites_per_s': sprites / total if total else 0.0,
+        'final_level': sim.state.level
+    }
+
+def git_revision():
+    """Current git commit, if the tree is a git checkout"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline):
+    """Print per-phase p95 changes against a previous results file"""
+    for name, scenario in results['scenarios'].items():
+        old = baseline.get('scenarios', {}).get(name)
+        if not old:
+            continue
+        print(f"{name}:")
+        for phase, stats in sorted(scenario['phases'].items()):
+            old_stats = old['phases'].get(phase)
+            if not old_stats or not old_stats['p95_us']:
+                continue
+            change = (stats['p95_us'] - old_stats['p95_us']) / old_stats['p95_us'] * 100
+            print(f"  {phase:<24} p95 {old_stats['p95_us']:9.1f} -> {stats['p95_us']:9.1f} us ({change:+.1f}%)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=600, help='ticks per scenario')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='scenario to run (repeatable, default: all)')
+    parser.add_argument('--fleet-backend', choices=['sprites', 'numpy'], default='sprites')
+    parser.add_argument('--renderer', choices=['batch', 'full'], default='batch',
+                        help='layered blits() renderer or one blit per sprite')
+    parser.add_argument('--prefetch', action='store_true',
+                        help="build each next level's fleet on a worker thread")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help='previous results JSON to compare against')
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    surface = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+    background.fill((0, 0, 0))
+    renderer = (BatchRenderer if args.renderer == 'batch' else Renderer)(surface, background)
+
+    results = {
+        'commit': git_revision(),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'machine': platform.machine(),
+        'ticks': args.ticks,
+        'seed': args.seed,
+        'fleet_backend': args.fleet_backend,
+        'prefetch': args.prefetch,
+        'renderer': args.renderer,
+        'scenarios': {}
+    }
+    for name in args.scenario or SCENARIOS:
+        result = run_scenario(name, args.ticks, args.seed, renderer, args.fleet_backend,
+                              args.prefetch)
+        results['scenarios'][name] = result
+        print(f"{name:<22} tick p50 {result['tick']['p50_us']:8.1f} us  "
+              f"p99 {result['tick']['p99_us']:8.1f} us  "
+              f"{result['sprites_per_s']:12.0f} sprites/s  "
+              f"{result['bullets_allocated']:5d} bullets allocated")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
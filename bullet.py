@@ -3,24 +3,51 @@ Bullet class for the Galaxian game
 """
 import pygame
 
+PLAYER_BULLET_COLOR = (0, 255, 255)  # Cyan for player bullets
+ENEMY_BULLET_COLOR = (255, 255, 0)  # Yellow for enemy bullets
+BULLET_SIZE = (4, 10)
+
+# One pre-filled surface per bullet colour, shared by every bullet
+_images = {}
+
+def bullet_image(color):
+    """Shared bullet surface for a colour"""
+    image = _images.get(color)
+    if image is None:
+        image = pygame.Surface(BULLET_SIZE)
+        image.fill(color)
+        _images[color] = image
+    return image
+
+
 class Bullet(pygame.sprite.Sprite):
-    def __init__(self, x, y, speed):
+    def __init__(self, x, y, speed, pool=None):
         pygame.sprite.Sprite.__init__(self)
-        
-        # Create bullet image
-        self.image = pygame.Surface((4, 10))
-        
+        self.pool = pool
+        self.rect = pygame.Rect((0, 0), BULLET_SIZE)
+        self.reset(x, y, speed)
+
+    def reset(self, x, y, speed):
+        """Place the bullet and pick its image, for a new or recycled bullet"""
         # Color based on direction (player or enemy)
         if speed < 0:  # Player bullet (moving up)
-            self.image.fill((0, 255, 255))  # Cyan for player bullets
+            self.image = bullet_image(PLAYER_BULLET_COLOR)
         else:  # Enemy bullet (moving down)
-            self.image.fill((255, 255, 0))  # Yellow for enemy bullets
-        
-        self.rect = self.image.get_rect()
+            self.image = bullet_image(ENEMY_BULLET_COLOR)
+
         self.rect.centerx = x
         self.rect.bottom = y
         self.speed = speed
-    
+        self.active = True
+
+    def kill(self):
+        pygame.sprite.Sprite.kill(self)
+        # Hand the bullet back for reuse; guard against a second kill()
+        if self.active:
+            self.active = False
+            if self.pool is not None:
+                self.pool.release(self)
+
     def update(self):
         # Move the bullet
         self.rect.y += self.speed
@@ -28,3 +55,61 @@ class Bullet(pygame.sprite.Sprite):
         # Remove if it goes off screen
         if self.rect.bottom < 0 or self.rect.top > 600:
             self.kill()
+
+
+class BulletPool:
+    """
+    Recycles killed bullets
+
+    acquire() hands out a free bullet, or constructs one when the pool is
+    empty, and a bullet returns itself to its pool when killed. Once the
+    pool has grown to the peak number of bullets in flight, firing
+    allocates nothing. in_use counts bullets handed out and not yet
+    released.
+    """
+    def __init__(self):
+        self._free = []
+        self.allocated = 0
+        self.reused = 0
+        self.in_use = 0
+
+    def acquire(self, x, y, speed):
+        """
+        Get a bullet placed at (x, y)
+
+        Args:
+            x (int): Horizontal center
+            y (int): Bottom edge
+            speed (int): Vertical speed; negative moves up (player bullet)
+
+        Returns:
+            Bullet: A recycled or new bullet in no sprite groups
+        """
+        self.in_use += 1
+        if self._free:
+            bullet = self._free.pop()
+            bullet.reset(x, y, speed)
+            self.reused += 1
+            return bullet
+        self.allocated += 1
+        return Bullet(x, y, speed, pool=self)
+
+    def release(self, bullet):
+        self.in_use -= 1
+        self._free.append(bullet)
+
+    def clear(self):
+        self._free.clear()
+
+    def stats(self):
+        """Pool counters for profiling"""
+        return {
+            'free': len(self._free),
+            'in_use': self.in_use,
+            'allocated': self.allocated,
+            'reused': self.reused
+        }
+
+
+# Shared pool used by the player and enemies
+bullet_pool = BulletPool()
@@ -3,31 +3,78 @@ Enemy classes for the Galaxian game
 """
 import pygame
 import random
-from bullet import Bullet
-from game_utils import load_image
+from bullet import bullet_pool
+from game_utils import load_sprite
+from fleet_arrays import FleetArrays
+from formations import formation_layout
+from level_generator import LevelGenerator
+
+# Sprite name and size for each enemy type
+ENEMY_IMAGES = {
+    0: ('enemy1', 40, 40),  # Basic enemy
+    1: ('enemy2', 40, 40),  # Medium enemy
+    2: ('enemy3', 50, 50),  # Boss enemy
+}
+
+# Colour keyed out of small enemy images
+SMALL_IMAGE_KEY = (255, 0, 255)
+
+# (enemy_type, size) -> shared small enemy image
+_small_images = {}
+
+def small_enemy_image(enemy_type, size):
+    """
+    Get a colorkeyed enemy image at a small size, as used in swarm mode
+
+    At a few pixels across, colorkeyed RLE surfaces look the same as the
+    per-pixel alpha originals and blit several times faster.
+
+    Args:
+        enemy_type (int): Enemy type, a key of ENEMY_IMAGES
+        size (int): Width and height in pixels
+
+    Returns:
+        pygame.Surface: The shared image
+    """
+    key = (enemy_type, size)
+    image = _small_images.get(key)
+    if image is None:
+        name = ENEMY_IMAGES[enemy_type][0]
+        image = pygame.Surface((size, size))
+        image.fill(SMALL_IMAGE_KEY)
+        image.blit(load_sprite(name, size, size), (0, 0))
+        image.set_colorkey(SMALL_IMAGE_KEY, pygame.RLEACCEL)
+        if pygame.display.get_surface() is not None:
+            image = image.convert()
+        _small_images[key] = image
+    return image
+
 
 class Enemy(pygame.sprite.Sprite):
-    def __init__(self, x, y, enemy_type=0):
+    def __init__(self, x, y, enemy_type=0, rng=None, size=None):
         pygame.sprite.Sprite.__init__(self)
         
+        # Random stream for movement and dive decisions
+        self.rng = rng or random
+        
         # Different enemy types
         self.enemy_type = enemy_type
         
-        # Load enemy ship image based on type
+        # Load enemy ship image based on type, optionally at a smaller size
+        name, width, height = ENEMY_IMAGES[min(enemy_type, 2)]
+        if size is not None:
+            width = height = size
         try:
-            if enemy_type == 0:  # Basic enemy
-                self.image = load_image('assets/enemy1.png', 40, 40)
-            elif enemy_type == 1:  # Medium enemy
-                self.image = load_image('assets/enemy2.png', 40, 40)
-            else:  # Boss enemy
-                self.image = load_image('assets/enemy3.png', 50, 50)
+            if size is None:
+                self.image = load_sprite(name, width, height)
+            else:
+                self.image = small_enemy_image(min(enemy_type, 2), size)
         except:
             # Fallback to simple shapes if image loading fails
+            self.image = pygame.Surface((width, height))
             if enemy_type == 2:  # Boss
-                self.image = pygame.Surface((50, 50))
                 self.image.fill((255, 0, 0))
             else:
-                self.image = pygame.Surface((40, 40))
                 self.image.fill((255, 0, 0) if enemy_type == 1 else (255, 165, 0))
             
             # Draw a simple alien shape
@@ -41,7 +88,7 @@ class Enemy(pygame.sprite.Sprite):
         self.rect.y = y
         
         # Movement parameters
-        self.speed_x = random.choice([-1, 1]) * (2 + enemy_type)
+        self.speed_x = self.rng.choice([-1, 1]) * (2 + enemy_type)
         self.speed_y = 0
         self.dive_chance = 0.001 * (enemy_type + 1)  # Higher chance for stronger enemies
         self.diving = False
@@ -49,17 +96,29 @@ class Enemy(pygame.sprite.Sprite):
         
         # Shooting parameters
         self.shoot_chance = 0.002 * (enemy_type + 1)  # Higher chance for stronger enemies
+        
+        # Set when a FleetArrays backend moves this enemy instead of update()
+        self.fleet = None
+        self.slot = None
+    
+    def kill(self):
+        if self.fleet is not None:
+            self.fleet.remove(self.slot)
+        pygame.sprite.Sprite.kill(self)
     
     def update(self):
+        if self.fleet is not None:
+            return  # Moved in bulk by the fleet
+        
         # Regular movement
         if not self.diving:
             self.rect.x += self.speed_x
             
             # Random chance to start diving
-            if random.random() < self.dive_chance:
+            if self.rng.random() < self.dive_chance:
                 self.diving = True
                 self.speed_y = 5 + self.enemy_type
-                self.dive_target_x = random.randint(50, 750)  # Random x position to dive towards
+                self.dive_target_x = self.rng.randint(50, 750)  # Random x position to dive towards
         else:
             # Diving behavior
             self.rect.y += self.speed_y
@@ -83,33 +142,79 @@ class Enemy(pygame.sprite.Sprite):
     def shoot(self):
         # Only shoot if not diving
         if not self.diving:
-            return Bullet(self.rect.centerx, self.rect.bottom, 5)  # 5 for downward movement
+            return bullet_pool.acquire(self.rect.centerx, self.rect.bottom, 5)  # 5 for downward movement
         return None
 
 
 class EnemyFleet:
-    def __init__(self, screen_width, level):
+    """
+    A level's formation of enemies
+
+    The formation comes from LevelGenerator for the level unless one is
+    passed in, and its positions from the shared formation layout cache.
+
+    With backend='numpy' the formation's movement runs in a FleetArrays
+    struct-of-arrays and update() moves every enemy at once; with the
+    default 'sprites' backend each Enemy moves itself in Enemy.update().
+    A numpy fleet can also draw itself in one blits() call with draw(),
+    so its enemies need not be in a sprite group that is updated or drawn.
+    """
+    def __init__(self, screen_width, level, rng=None, backend='sprites', formation=None,
+                 screen_height=600, enemy_size=None):
         self.enemies = []
+        self.arrays = None
         
-        # Adjust difficulty based on level
-        rows = min(3 + level // 2, 6)  # More rows as level increases, max 6
-        cols = min(6 + level // 3, 10)  # More columns as level increases, max 10
+        # Formation grows and changes shape as the level increases
+        if formation is None:
+            generator = LevelGenerator(screen_width, screen_height, rng)
+            formation = generator.generate_level(level)['formation']
+        self.formation = formation
+        layout = formation_layout(formation, screen_width, screen_height)
+        
+        # Medium enemies at the front, with a boss in its middle from level 3.
+        # The front is the top row, widened to the enemies nearest the top
+        # (then the middle) to at least the share of the fleet the original
+        # grid's top row had, since a circle or wave has one enemy on top.
+        rows = min(3 + level // 2, 6)
+        top_row = sum(1 for _, _, rank in layout if rank == 0)
+        center = sum(x for x, _, _ in layout) / len(layout)
+        order = sorted(range(len(layout)), key=lambda i: (layout[i][1], abs(layout[i][0] - center)))
+        front = order[:max(top_row, round(len(layout) / rows))]
+        boss = None
+        if level > 2:
+            boss = min(front, key=lambda i: (abs(layout[i][0] - center), layout[i][1]))
+        front = set(front)
         
         # Create enemy formation
-        for row in range(rows):
-            for col in range(cols):
-                # Determine enemy type based on row
-                if row == 0 and col == cols // 2 and level > 2:
-                    enemy_type = 2  # Boss in the middle of first row on higher levels
-                elif row == 0:
-                    enemy_type = 1  # Medium enemies in first row
-                else:
-                    enemy_type = 0  # Basic enemies in other rows
-                
-                # Calculate position
-                x = 100 + col * 60
-                y = 50 + row * 50
-                
-                # Create enemy
-                enemy = Enemy(x, y, enemy_type)
-                self.enemies.append(enemy)
+        for i, (x, y, _) in enumerate(layout):
+            # Determine enemy type by position in the formation
+            if i == boss:
+                enemy_type = 2
+            elif i in front:
+                enemy_type = 1  # Medium enemies at the front
+            else:
+                enemy_type = 0  # Basic enemies behind them
+            
+            # Create enemy
+            enemy = Enemy(x, y, enemy_type, rng, enemy_size)
+            self.enemies.append(enemy)
+        
+        if backend == 'numpy':
+            seed = (rng or random).getrandbits(64)
+            self.arrays = FleetArrays.from_enemies(self.enemies, seed=seed)
+        elif backend != 'sprites':
+            raise ValueError(f"Unknown fleet backend: {backend}")
+    
+    def update(self):
+        """Move the whole formation (only needed for the numpy backend)"""
+        if self.arrays is not None:
+            self.arrays.update()
+
+    def draw(self, surface):
+        """Draw every live, on-screen enemy in one blits() call"""
+        if self.arrays is None:
+            enemies = [enemy for enemy in self.enemies if enemy.alive()]
+        else:
+            # Off-screen divers and returning enemies are culled in bulk
+            enemies = [self.enemies[slot] for slot in self.arrays.visible_slots().tolist()]
+        surface.blits([(enemy.image, enemy.rect) for enemy in enemies], False)
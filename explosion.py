@@ -3,123 +3,183 @@ Explosion animation class for the Galaxian game
 """
 import pygame
 import random
+import math
+from sound_bank import sound_bank
+from game_clock import wall_clock
+
+# Number of pre-rendered particle layouts per (size, rocket/regular) pair
+FRAME_VARIANTS = 4
+
+# Animation frames per explosion style
+FRAME_COUNTS = {False: 8, True: 12}
+
+# Particles per burst and their largest radius when drawn by a ParticleSystem
+BURST_PARTICLES = {False: 15, True: 25}
+BURST_MAX_RADIUS = {False: 3, True: 5}
+
+# (size, is_rocket, variant) -> list of animation frames
+_frame_cache = {}
+
+def _render_frame(size, is_rocket, frame, frame_count, rng):
+    """Draw one explosion animation frame"""
+    image = pygame.Surface((size, size), pygame.SRCALPHA)
+    
+    # Different colors for different frames
+    if is_rocket:
+        # Rocket explosion colors
+        if frame < 3:
+            color = (255, 255, 255)  # White
+        elif frame < 6:
+            color = (255, 255, 0)    # Yellow
+        elif frame < 9:
+            color = (255, 165, 0)    # Orange
+        else:
+            color = (255, 69, 0)     # Red-Orange
+            
+        # Draw more particles for rocket explosions
+        particles = 25
+        max_radius = 5
+    else:
+        # Regular explosion colors
+        if frame < 3:
+            color = (255, 255, 255)  # White
+        elif frame < 5:
+            color = (255, 255, 0)    # Yellow
+        else:
+            color = (255, 165, 0)    # Orange
+            
+        particles = 15
+        max_radius = 3
+    
+    # Draw explosion particles
+    distance = (frame / frame_count) * (size / 2)
+    for _ in range(particles):
+        # Calculate position based on frame (expanding outward)
+        angle = math.radians(rng.uniform(0, 360))
+        x = int(size / 2 + distance * math.cos(angle))
+        y = int(size / 2 + distance * math.sin(angle))
+        
+        # Keep within bounds
+        x = max(0, min(x, size - 1))
+        y = max(0, min(y, size - 1))
+        
+        radius = rng.randint(1, max_radius)
+        pygame.draw.circle(image, color, (x, y), radius)
+    
+    # Add a glow effect for rocket explosions
+    if is_rocket:
+        glow_surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        glow_radius = int(size / 2 * (frame / frame_count))
+        pygame.draw.circle(glow_surface, (255, 165, 0, 50), 
+                          (size // 2, size // 2), glow_radius)
+        image.blit(glow_surface, (0, 0))
+    
+    # Make black background transparent
+    image.set_colorkey((0, 0, 0))
+    return image
+
+def get_explosion_frames(size, is_rocket, variant=0):
+    """
+    Get the shared animation frames for an explosion
+
+    Frames are rendered the first time a (size, is_rocket, variant) key is
+    requested and reused by every later explosion with the same key.
+
+    Args:
+        size (int): Explosion width and height in pixels
+        is_rocket (bool): Whether to use the rocket explosion style
+        variant (int): Which of the FRAME_VARIANTS particle layouts to use
+
+    Returns:
+        list: Surfaces indexed by animation frame (frame 0 is blank)
+    """
+    key = (size, is_rocket, variant)
+    frames = _frame_cache.get(key)
+    if frames is None:
+        frame_count = FRAME_COUNTS[is_rocket]
+        # A private RNG keeps baking from disturbing the game's random stream
+        rng = random.Random(hash(key))
+        frames = [pygame.Surface((size, size), pygame.SRCALPHA)]
+        for frame in range(1, frame_count):
+            frames.append(_render_frame(size, is_rocket, frame, frame_count, rng))
+        _frame_cache[key] = frames
+    return frames
+
+def preload_explosion_frames(sizes=range(20, 41), rocket_sizes=(100,)):
+    """Render every explosion variant the game uses ahead of time"""
+    for variant in range(FRAME_VARIANTS):
+        for size in sizes:
+            get_explosion_frames(size, False, variant)
+        for size in rocket_sizes:
+            get_explosion_frames(size, True, variant)
+
 
 class Explosion(pygame.sprite.Sprite):
-    def __init__(self, center, size=None, is_rocket=False):
+    """
+    An explosion at a point
+
+    Without a particle system the explosion animates through shared
+    pre-rendered frames. With one, it emits a burst into the system and
+    only keeps its rect and lifetime; it has no image of its own and the
+    particle system draws it.
+    """
+    def __init__(self, center, size=None, is_rocket=False, clock=None, rng=None, particles=None):
         pygame.sprite.Sprite.__init__(self)
         
+        # Time source and random stream
+        self.clock = clock or wall_clock
+        rng = rng or random
+        
         # Set explosion size
         if size is None:
-            self.size = random.randint(20, 40)
+            self.size = rng.randint(20, 40)
         else:
             self.size = size
             
         self.is_rocket = is_rocket
         
-        # Create initial explosion frame
-        self.image = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
-        if self.is_rocket:
-            # Rocket explosions are larger and more colorful
-            color = (255, 255, 255)
-        else:
-            color = (255, 255, 255)
+        # Drawn in both modes so the game's random stream does not depend
+        # on whether a particle system is available
+        variant = rng.randrange(FRAME_VARIANTS)
         
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, self.size, self.size)
         self.rect.center = center
         
         # Animation parameters
         self.frame = 0
         self.frame_rate = 50  # milliseconds per frame
-        self.last_update = pygame.time.get_ticks()
-        self.frame_count = 12 if self.is_rocket else 8  # More frames for rocket explosions
+        self.last_update = self.clock.get_ticks()
+        self.frame_count = FRAME_COUNTS[self.is_rocket]  # More frames for rocket explosions
+        
+        self.particles = particles
+        if particles is None:
+            # Shared pre-rendered frames, one of several particle layouts
+            self.frames = get_explosion_frames(self.size, self.is_rocket, variant)
+            self.image = self.frames[0]
+        else:
+            self.frames = None
+            self.image = None
+            particles.emit_burst(center, BURST_PARTICLES[self.is_rocket], self.size / 2,
+                                 self.frame_count * self.frame_rate,
+                                 'rocket' if self.is_rocket else 'explosion',
+                                 BURST_MAX_RADIUS[self.is_rocket])
         
         # Sound effect
-        try:
-            if self.is_rocket:
-                self.explosion_sound = pygame.mixer.Sound('assets/big_explosion.wav')
-                self.explosion_sound.set_volume(0.5)
-            else:
-                self.explosion_sound = pygame.mixer.Sound('assets/explosion.wav')
-                self.explosion_sound.set_volume(0.3)
-            self.explosion_sound.play()
-        except:
-            pass
+        sound_bank.play('big_explosion' if self.is_rocket else 'explosion')
     
     def update(self):
-        now = pygame.time.get_ticks()
+        now = self.clock.get_ticks()
         if now - self.last_update > self.frame_rate:
             self.last_update = now
             self.frame += 1
             
             if self.frame >= self.frame_count:
                 self.kill()  # Remove explosion when animation is complete
-            else:
-                # Create new explosion frame
-                old_center = self.rect.center
-                self.image = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
-                
-                # Different colors for different frames
-                if self.is_rocket:
-                    # Rocket explosion colors
-                    if self.frame < 3:
-                        color = (255, 255, 255)  # White
-                    elif self.frame < 6:
-                        color = (255, 255, 0)    # Yellow
-                    elif self.frame < 9:
-                        color = (255, 165, 0)    # Orange
-                    else:
-                        color = (255, 69, 0)     # Red-Orange
-                        
-                    # Draw more particles for rocket explosions
-                    particles = 25
-                    max_radius = 5
-                else:
-                    # Regular explosion colors
-                    if self.frame < 3:
-                        color = (255, 255, 255)  # White
-                    elif self.frame < 5:
-                        color = (255, 255, 0)    # Yellow
-                    else:
-                        color = (255, 165, 0)    # Orange
-                        
-                    particles = 15
-                    max_radius = 3
-                
-                # Draw explosion particles
-                for _ in range(particles):
-                    # Calculate position based on frame (expanding outward)
-                    distance = (self.frame / self.frame_count) * (self.size / 2)
-                    angle = random.uniform(0, 360)
-                    dx = distance * pygame.math.Vector2(1, 0).rotate(angle).x
-                    dy = distance * pygame.math.Vector2(1, 0).rotate(angle).y
-                    
-                    x = int(self.size / 2 + dx)
-                    y = int(self.size / 2 + dy)
-                    
-                    # Keep within bounds
-                    x = max(0, min(x, self.size - 1))
-                    y = max(0, min(y, self.size - 1))
-                    
-                    radius = random.randint(1, max_radius)
-                    pygame.draw.circle(self.image, color, (x, y), radius)
-                
-                # Add a glow effect for rocket explosions
-                if self.is_rocket:
-                    glow_surface = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
-                    glow_radius = int(self.size / 2 * (self.frame / self.frame_count))
-                    pygame.draw.circle(glow_surface, (255, 165, 0, 50), 
-                                      (self.size // 2, self.size // 2), glow_radius)
-                    self.image.blit(glow_surface, (0, 0))
-                
-                # Make black background transparent
-                self.image.set_colorkey((0, 0, 0))
-                
-                # Keep the explosion centered
-                self.rect = self.image.get_rect()
-                self.rect.center = old_center
+            elif self.frames:
+                self.image = self.frames[self.frame]
 
 
 class RocketExplosion(Explosion):
     """Special explosion for rockets with larger area effect"""
-    def __init__(self, center):
-        super().__init__(center, size=100, is_rocket=True)
+    def __init__(self, center, clock=None, rng=None, particles=None):
+        super().__init__(center, size=100, is_rocket=True, clock=clock, rng=rng, particles=particles)
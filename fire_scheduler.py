@@ -0,0 +1,89 @@
+"""
+Enemy fire scheduling for the Galaxian game
+
+Decides which enemies shoot on a tick. Every enemy still fires with its
+own independent chance, but instead of drawing one random number per enemy
+the scheduler draws the gap to the next shooter from a geometric
+distribution, so a tick costs one draw per shot fired plus one per enemy
+type rather than one per enemy.
+"""
+import math
+
+# Average chance per enemy per tick, multiplied by the level
+FIRE_CHANCE_PER_LEVEL = 0.005
+
+class FireScheduler:
+    """
+    Batched fire decisions for one fleet
+
+    Enemies fire in proportion to their Enemy.shoot_chance, scaled so that
+    the fleet as a whole fires FIRE_CHANCE_PER_LEVEL * level shots per enemy
+    per tick on average.
+
+    set_fleet() groups the enemies by shoot chance once per fleet. Killed
+    enemies stay in their group and are simply passed over when picked,
+    which keeps every live enemy's chance independent and exact.
+    """
+    def __init__(self, rng, max_bullets=None):
+        self.rng = rng
+        self.max_bullets = max_bullets
+        self._groups = []
+        self._scale = 0.0
+        self._level = None
+        self._rates = []
+
+    def set_fleet(self, enemies):
+        """Group a new fleet's enemies by their shoot chance"""
+        groups = {}
+        for enemy in enemies:
+            groups.setdefault(enemy.shoot_chance, []).append(enemy)
+        self._groups = sorted(groups.items())
+        total = sum(shoot_chance * len(group) for shoot_chance, group in self._groups)
+        self._scale = FIRE_CHANCE_PER_LEVEL * len(enemies) / total if total else 0.0
+        self._level = None
+
+    def _set_level(self, level):
+        """Precompute log(1 - chance) per group; None means every enemy fires"""
+        self._level = level
+        self._rates = []
+        for shoot_chance, enemies in self._groups:
+            chance = shoot_chance * self._scale * level
+            if chance <= 0:
+                continue
+            self._rates.append((enemies, math.log(1.0 - chance) if chance < 1 else None))
+
+    def shooters(self, level, in_flight=0):
+        """
+        Pick the enemies that fire this tick
+
+        Args:
+            level (int): Current level; fire chance scales with it
+            in_flight (int): Enemy bullets already on screen, checked
+                against max_bullets
+
+        Returns:
+            list: Live, non-diving enemies that should shoot
+        """
+        if level != self._level:
+            self._set_level(level)
+        random = self.rng.random
+        log = math.log
+        shooters = []
+        for enemies, log_miss in self._rates:
+            if log_miss is None:
+                shooters.extend(enemy for enemy in enemies if enemy.alive() and not enemy.diving)
+                continue
+            # The number of misses before each hit is geometric
+            count = len(enemies)
+            index = int(log(1.0 - random()) / log_miss)
+            while index < count:
+                enemy = enemies[index]
+                if enemy.alive() and not enemy.diving:
+                    shooters.append(enemy)
+                index += 1 + int(log(1.0 - random()) / log_miss)
+
+        if self.max_bullets is not None:
+            room = max(0, self.max_bullets - in_flight)
+            if len(shooters) > room:
+                shooters = self.rng.sample(shooters, room)
+        return shooters
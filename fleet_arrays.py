@@ -0,0 +1,204 @@
+"""
+NumPy struct-of-arrays backend for enemy fleet movement
+
+Positions, velocities, dive state, dive targets and enemy types live in
+parallel arrays, and the whole formation moves with a few vectorized
+operations per tick instead of one Enemy.update call per sprite. The rules
+are the same as Enemy.update; only the random stream differs.
+"""
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only this backend needs it
+    np = None
+
+class FleetArrays:
+    """
+    Movement state for a whole fleet
+
+    Sprites bound with bind() get their rect and diving flag written back
+    after every update() so that collisions and drawing see the new state.
+    Call remove() when a sprite dies so its slot stops moving.
+    """
+    # Per-slot arrays update() writes, and those fixed once built
+    _MOVING = ('x', 'y', 'speed_x', 'speed_y', 'diving', 'dive_target_x', 'alive')
+    _FIXED = ('enemy_type', 'width', 'height', 'dive_chance', 'original_y', 'screen_width',
+              'screen_height')
+    def __init__(self, x, y, enemy_type, speed_x, width, height, dive_chance, seed=None,
+                 screen_width=800, screen_height=600):
+        if np is None:
+            raise ImportError("the numpy fleet backend requires numpy")
+        self.x = np.asarray(x, dtype=np.int64)
+        self.y = np.asarray(y, dtype=np.int64)
+        self.enemy_type = np.asarray(enemy_type, dtype=np.int64)
+        self.speed_x = np.asarray(speed_x, dtype=np.int64)
+        self.width = np.asarray(width, dtype=np.int64)
+        self.height = np.asarray(height, dtype=np.int64)
+        self.dive_chance = np.asarray(dive_chance, dtype=np.float64)
+        count = len(self.x)
+        self.speed_y = np.zeros(count, dtype=np.int64)
+        self.diving = np.zeros(count, dtype=bool)
+        self.dive_target_x = np.zeros(count, dtype=np.int64)
+        self.original_y = self.y.copy()
+        self.alive = np.ones(count, dtype=bool)
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.rng = np.random.default_rng(seed)
+        self.sprites = None
+        self._rects = None
+        self._changed_dive = np.zeros(count, dtype=bool)
+
+    @classmethod
+    def from_enemies(cls, enemies, seed=None):
+        """Build arrays from Enemy sprites and bind them for write-back"""
+        arrays = cls([enemy.rect.x for enemy in enemies],
+                     [enemy.rect.y for enemy in enemies],
+                     [enemy.enemy_type for enemy in enemies],
+                     [enemy.speed_x for enemy in enemies],
+                     [enemy.rect.width for enemy in enemies],
+                     [enemy.rect.height for enemy in enemies],
+                     [enemy.dive_chance for enemy in enemies],
+                     seed=seed)
+        arrays.bind(enemies)
+        return arrays
+
+    def getstate(self):
+        """
+        Copy the movement state and random stream
+
+        Arrays that update() never writes are shared rather than copied.
+
+        Returns:
+            dict: State for from_state()
+        """
+        state = {name: getattr(self, name).copy() for name in self._MOVING}
+        state.update((name, getattr(self, name)) for name in self._FIXED)
+        state['rng'] = self.rng.bit_generator.state
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        """Build unbound arrays from a getstate() result"""
+        arrays = cls(state['x'], state['y'], state['enemy_type'], state['speed_x'], state['width'],
+                     state['height'], state['dive_chance'], seed=0, screen_width=state['screen_width'],
+                     screen_height=state['screen_height'])
+        for name in cls._MOVING:
+            setattr(arrays, name, state[name].copy())
+        arrays.original_y = state['original_y']
+        arrays.rng.bit_generator.state = state['rng']
+        return arrays
+
+    def bind(self, sprites):
+        """Attach sprites, one per slot, that mirror the array state"""
+        self.sprites = list(sprites)
+        self._rects = [sprite.rect for sprite in self.sprites]
+        for slot, sprite in enumerate(self.sprites):
+            sprite.fleet = self
+            sprite.slot = slot
+
+    def remove(self, slot):
+        self.alive[slot] = False
+
+    def update(self):
+        """Move every live enemy one tick"""
+        alive = self.alive
+        idle = alive & ~self.diving
+        diving = alive & self.diving
+        changed = self._changed_dive
+        changed[:] = False
+
+        # Formation movement and the random chance to start a dive
+        self.x[idle] += self.speed_x[idle]
+        start = idle & (self.rng.random(len(alive)) < self.dive_chance)
+        starts = int(start.sum())
+        if starts:
+            self.diving[start] = True
+            self.speed_y[start] = 5 + self.enemy_type[start]
+            self.dive_target_x[start] = self.rng.integers(50, 751, size=starts)
+            changed |= start
+
+        # Divers fall, steer towards their target and wrap back to the top
+        if diving.any():
+            self.y[diving] += self.speed_y[diving]
+            self.x[diving] += 3 * np.sign(self.dive_target_x[diving] - self.x[diving])
+            wrapped = diving & (self.y > self.screen_height)
+            self.y[wrapped] = self.original_y[wrapped] - self.screen_height
+            self.diving[wrapped] = False
+            self.speed_y[wrapped] = 0
+            changed |= wrapped
+
+        # Change direction when hitting screen edges
+        edge = alive & ((self.x + self.width > self.screen_width) | (self.x < 0))
+        self.speed_x[edge] *= -1
+
+        if self.sprites is not None:
+            self.write_back()
+
+    def visible_slots(self):
+        """Slots of live enemies that overlap the screen vertically"""
+        return np.flatnonzero(self.alive & (self.y < self.screen_height) & (self.y + self.height > 0))
+
+    def cell_buckets(self, cell_size):
+        """
+        Bucket live enemies by the grid cell holding their rect center
+
+        The vectorized counterpart of SpatialHash.rebuild() for a bound
+        fleet: cells are computed and sorted in bulk, and a cell's
+        (slot, sprite) list is only built if a query visits it.
+
+        Args:
+            cell_size (int): Grid cell size in pixels
+
+        Returns:
+            tuple: (cell mapping for SpatialHash.load_buckets, max width, max height)
+        """
+        slots = np.flatnonzero(self.alive)
+        if not len(slots):
+            return {}, 0, 0
+        width = self.width[slots]
+        height = self.height[slots]
+        cell_x = (self.x[slots] + width // 2) // cell_size
+        cell_y = (self.y[slots] + height // 2) // cell_size
+
+        # A stable sort on one combined key groups each cell's enemies
+        # together while keeping them in slot order
+        span = int(cell_y.max() - cell_y.min()) + 1
+        code = (cell_x - cell_x.min()) * span + (cell_y - cell_y.min())
+        order = np.argsort(code, kind='stable')
+        bounds = [0] + (np.flatnonzero(np.diff(code[order])) + 1).tolist() + [len(slots)]
+        first = order[bounds[:-1]]
+        ranges = dict(zip(zip(cell_x[first].tolist(), cell_y[first].tolist()),
+                          zip(bounds[:-1], bounds[1:])))
+        cells = _LazyCells(ranges, slots[order].tolist(), self.sprites)
+        return cells, int(width.max()), int(height.max())
+
+    def write_back(self):
+        """Copy positions of live slots, and dive state changes, onto their sprites"""
+        rects = self._rects
+        slots = np.flatnonzero(self.alive)
+        for slot, x, y in zip(slots.tolist(), self.x[slots].tolist(), self.y[slots].tolist()):
+            rects[slot].topleft = (x, y)
+
+        sprites = self.sprites
+        changed = np.flatnonzero(self._changed_dive & self.alive)
+        for slot, diving in zip(changed.tolist(), self.diving[changed].tolist()):
+            sprites[slot].diving = diving
+
+
+class _LazyCells:
+    """Cell mapping for SpatialHash that builds each cell's entries on first use"""
+    def __init__(self, ranges, slots, sprites):
+        self._ranges = ranges
+        self._slots = slots
+        self._sprites = sprites
+        self._built = {}
+
+    def get(self, key):
+        bucket = self._built.get(key)
+        if bucket is None:
+            bounds = self._ranges.get(key)
+            if bounds is None:
+                return None
+            sprites = self._sprites
+            bucket = [(slot, sprites[slot]) for slot in self._slots[bounds[0]:bounds[1]]]
+            self._built[key] = bucket
+        return bucket
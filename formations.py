@@ -0,0 +1,182 @@
+"""
+Enemy formation layouts for the Galaxian game
+
+Turns the formation parameters produced by LevelGenerator into concrete
+enemy positions. Neighbouring enemies are kept at least ENEMY_SIZE apart,
+so sprites never overlap; a formation too large for the screen is built
+with fewer enemies rather than squeezed. Layouts are memoized per
+(formation parameters, screen size), so spawning a wave whose formation has
+been seen before is a single cache lookup.
+"""
+import math
+from functools import lru_cache
+
+# Room kept free along the screen edges and for the HUD at the top
+MARGIN_X = 20
+TOP_MARGIN = 50
+
+# Formations may fill the screen down to this fraction of its height
+MAX_DEPTH = 0.6
+
+# Widest enemy sprite; layout points are sprite top-left corners
+ENEMY_SIZE = 50
+
+def _standard_grid(f, room_x, room_y):
+    spacing_x = max(f['spacing_x'], ENEMY_SIZE)
+    spacing_y = max(f['spacing_y'], ENEMY_SIZE)
+    rows = min(f['rows'], int(room_y // spacing_y) + 1)
+    cols = min(f['cols'], int(room_x // spacing_x) + 1)
+    return [(f['offset_x'] + col * spacing_x, f['offset_y'] + row * spacing_y)
+            for row in range(rows) for col in range(cols)]
+
+def _v_formation(f, room_x, room_y):
+    # Tip at the bottom, arms opening upwards
+    spacing = max(f['spacing'], ENEMY_SIZE)
+    row_step = spacing * 0.75
+    size = min(f['size'], int(room_x // (2 * spacing)) + 1, int(room_y // row_step) + 1)
+    points = [(f['offset_x'], f['offset_y'] + (size - 1) * row_step)]
+    for i in range(1, size):
+        y = f['offset_y'] + (size - 1 - i) * row_step
+        points.append((f['offset_x'] - i * spacing, y))
+        points.append((f['offset_x'] + i * spacing, y))
+    return points
+
+def _circle(f, room_x, room_y):
+    # Neighbours a chord of ENEMY_SIZE * sqrt(2) apart cannot overlap at any
+    # angle, so fewer enemies fit on a circle small enough for the room
+    radius = min(f['radius'], room_x / 2, room_y / 2)
+    chord = ENEMY_SIZE * math.sqrt(2)
+    count = 1
+    if chord < 2 * radius:
+        count = min(f['count'], int(math.pi / math.asin(chord / (2 * radius))))
+    step = 2 * math.pi / count
+    return [(f['center_x'] + radius * math.cos(i * step),
+             f['center_y'] + radius * math.sin(i * step)) for i in range(count)]
+
+def _diamond(f, room_x, room_y):
+    size = f['size']
+    spacing = max(f['spacing'], ENEMY_SIZE)
+    row_step = max(spacing * 0.6, ENEMY_SIZE)
+    if (2 * size - 2) * row_step > room_y:
+        # Too tall: spread the rows out so that neighbouring rows, offset by
+        # half a spacing, can interleave and only every other row stacks
+        spacing = max(spacing, 2 * ENEMY_SIZE)
+        row_step = ENEMY_SIZE / 2
+    size = min(size, int(room_y // (2 * row_step)) + 1, int(room_x // spacing) + 1)
+    points = []
+    for row in range(-(size - 1), size):
+        count = size - abs(row)
+        y = f['offset_y'] + (row + size - 1) * row_step
+        points.extend((f['offset_x'] + (i - (count - 1) / 2) * spacing, y) for i in range(count))
+    return points
+
+def _wave(f, room_x, room_y):
+    spacing_x = max(f['spacing_x'], ENEMY_SIZE)
+    spacing_y = max(f['spacing_y'], ENEMY_SIZE)
+    amplitude = spacing_y / 2
+    # The sine adds one more spacing_y to the height
+    height = min(f['height'], int(room_y // spacing_y))
+    width = min(f['width'], int(room_x // spacing_x) + 1)
+    return [(f['offset_x'] + col * spacing_x,
+             f['offset_y'] + row * spacing_y + amplitude * math.sin(col * 2 * math.pi / width))
+            for row in range(height) for col in range(width)]
+
+def _swarm(f, room_x, room_y):
+    # Swarm enemies are smaller than ENEMY_SIZE; swarm_formation has
+    # already spaced them to fill the room
+    cols = f['cols']
+    return [(f['offset_x'] + (i % cols) * f['spacing_x'], f['offset_y'] + (i // cols) * f['spacing_y'])
+            for i in range(f['count'])]
+
+BUILDERS = {
+    'standard_grid': _standard_grid,
+    'v_formation': _v_formation,
+    'circle': _circle,
+    'diamond': _diamond,
+    'wave': _wave,
+    'swarm': _swarm,
+}
+
+def swarm_formation(count, screen_width=800, screen_height=600):
+    """
+    Formation parameters for a dense block of count enemies
+
+    Args:
+        count (int): Number of enemies
+        screen_width (int): Screen width the block should fill
+        screen_height (int): Screen height the block should fill
+
+    Returns:
+        dict: Parameters for formation_layout with type 'swarm'
+    """
+    room_x, room_y = _room(screen_width, screen_height)
+    cols = max(1, min(count, math.ceil(math.sqrt(count * room_x / room_y))))
+    rows = math.ceil(count / cols)
+    return {
+        'type': 'swarm',
+        'count': count,
+        'cols': cols,
+        'spacing_x': room_x / max(cols - 1, 1),
+        'spacing_y': room_y / max(rows - 1, 1),
+        'offset_x': MARGIN_X,
+        'offset_y': TOP_MARGIN
+    }
+
+def _room(screen_width, screen_height):
+    """Span available to sprite top-left corners"""
+    return (screen_width - 2 * MARGIN_X - ENEMY_SIZE,
+            screen_height * MAX_DEPTH - TOP_MARGIN - ENEMY_SIZE)
+
+def _fit(points, screen_width, screen_height):
+    """
+    Shift points so every sprite starts on screen
+
+    Points are never moved closer together, which would make sprites
+    overlap. The builders size formations to fit the room; any point of a
+    formation that is still too large is dropped.
+    """
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    left, top = min(xs), min(ys)
+    width, height = max(xs) - left, max(ys) - top
+    room_x, room_y = _room(screen_width, screen_height)
+
+    # Keep the formation where the generator put it unless it spills over,
+    # centring it if it is wider than the room
+    if width > room_x:
+        new_left = MARGIN_X + (room_x - width) / 2
+    else:
+        new_left = min(max(left, MARGIN_X), MARGIN_X + room_x - width)
+    new_top = min(max(top, TOP_MARGIN), TOP_MARGIN + max(room_y - height, 0))
+    fitted = [(round(new_left + x - left), round(new_top + y - top)) for x, y in points]
+    return [(x, y) for x, y in fitted
+            if MARGIN_X <= x <= MARGIN_X + room_x and y <= TOP_MARGIN + room_y]
+
+@lru_cache(maxsize=128)
+def _layout(formation, screen_width, screen_height):
+    params = dict(formation)
+    room_x, room_y = _room(screen_width, screen_height)
+    points = _fit(BUILDERS[params['type']](params, room_x, room_y), screen_width, screen_height)
+
+    # Rank 0 is the top row, the one furthest from the player
+    ranks = {y: rank for rank, y in enumerate(sorted({y for _, y in points}))}
+    return tuple((x, y, ranks[y]) for x, y in points)
+
+def formation_layout(formation, screen_width=800, screen_height=600):
+    """
+    Get enemy positions for a formation
+
+    Args:
+        formation (dict): Formation parameters from LevelGenerator
+        screen_width (int): Screen width the layout must fit
+        screen_height (int): Screen height the layout must fit
+
+    Returns:
+        tuple: (x, y, rank) per enemy, where (x, y) is the sprite's top-left
+            corner and rank numbers the distinct rows from the top
+    """
+    return _layout(tuple(sorted(formation.items())), screen_width, screen_height)
+
+def layout_cache_info():
+    """Hit and miss counts of the layout cache"""
+    return _layout.cache_info()
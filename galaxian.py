@@ -4,20 +4,21 @@ Galaxian Game - A space-themed fixed shooter game
 """
 import pygame
 import sys
-import random
+import time
+import argparse
 from pygame.locals import *
 
 # Import game components
-from player import Player
-from enemy import Enemy, EnemyFleet
-from bullet import Bullet
-from explosion import Explosion, RocketExplosion
-from powerup import PowerUp, Rocket
-from game_utils import load_image, draw_text
-
-# Initialize pygame
-pygame.init()
-pygame.mixer.init()
+from player import PLAYER_IMAGE, SHIELD_IMAGE
+from enemy import ENEMY_IMAGES
+from explosion import preload_explosion_frames
+from powerup import ROCKET_IMAGE, POWERUP_IMAGES
+from game_utils import load_image, draw_text, preload_sprites
+from sound_bank import sound_bank
+from renderer import BatchRenderer, DirtyRectRenderer, draw_world
+from simulation import Simulation, Inputs
+from profiler import FrameProfiler, NullProfiler
+from replay import Replay, ReplayRecorder, ReplayPlayer
 
 # Game constants
 SCREEN_WIDTH = 800
@@ -31,230 +32,253 @@ RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
 
-# Create the game window
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Galaxian")
-
-# Load background image
-try:
-    background = load_image('assets/background.png', SCREEN_WIDTH, SCREEN_HEIGHT)
-except:
-    # Fallback to a black background if image loading fails
-    background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-    background.fill(BLACK)
-
-# Game state
-class GameState:
-    def __init__(self):
-        self.score = 0
-        self.level = 1
-        self.lives = 3
-        self.game_over = False
-        self.paused = False
-
-def main():
+# Events after which the window's contents must be redrawn in full
+EXPOSE_EVENTS = (VIDEOEXPOSE, WINDOWEXPOSED, WINDOWRESTORED)
+
+def init_display():
+    """
+    Initialize pygame, open the game window and load shared assets
+
+    Returns:
+        tuple: (screen surface, background surface)
+    """
+    pygame.init()
+    pygame.mixer.init()
+    sound_bank.load_all()
+
+    # Create the game window
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Galaxian")
+
+    # Load background image
+    try:
+        background = load_image('assets/background.png', SCREEN_WIDTH, SCREEN_HEIGHT, convert='opaque')
+    except:
+        # Fallback to a black background if image loading fails
+        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        background.fill(BLACK)
+
+    # Decode every sprite image up front so level changes never touch the disk
+    preload_sprites([PLAYER_IMAGE, SHIELD_IMAGE, ROCKET_IMAGE] + list(POWERUP_IMAGES.values()) +
+                    list(ENEMY_IMAGES.values()))
+
+    return screen, background
+
+def draw_hud(renderer, game_state):
+    """Draw score, lives and level along the top of the screen"""
+    draw_text(renderer, f"Score: {game_state.score}", 22, SCREEN_WIDTH//2, 10, WHITE)
+    draw_text(renderer, f"Lives: {game_state.lives}", 22, 50, 10, WHITE)
+    draw_text(renderer, f"Level: {game_state.level}", 22, SCREEN_WIDTH-50, 10, WHITE)
+
+def make_renderer(screen, background, dirty_rects=False):
+    """Dirty-rect renderer, or the layered batch renderer drawing each layer with one blits() call"""
+    if dirty_rects:
+        return DirtyRectRenderer(screen, background)
+    return BatchRenderer(screen, background)
+
+def main(dirty_rects=False, profile=False, profile_csv=None, fleet_backend='sprites', swarm=None,
+         record=None):
+    screen, background = init_display()
+
     # Clock for controlling game speed
     clock = pygame.time.Clock()
-    
-    # Game state
-    game_state = GameState()
-    
-    # Create sprite groups
-    all_sprites = pygame.sprite.Group()
-    player_bullets = pygame.sprite.Group()
-    enemy_bullets = pygame.sprite.Group()
-    enemies = pygame.sprite.Group()
-    explosions = pygame.sprite.Group()
-    powerups = pygame.sprite.Group()
-    rockets = pygame.sprite.Group()
-    
-    # Create player
-    player = Player(SCREEN_WIDTH, SCREEN_HEIGHT)
-    all_sprites.add(player)
-    
-    # Add initial powerups for testing
-    shield_powerup = PowerUp(SCREEN_WIDTH // 3, 100, "shield")
-    rocket_powerup = PowerUp(2 * SCREEN_WIDTH // 3, 100, "rocket")
-    all_sprites.add(shield_powerup)
-    all_sprites.add(rocket_powerup)
-    powerups.add(shield_powerup)
-    powerups.add(rocket_powerup)
-    
-    # Create enemy fleet
-    enemy_fleet = EnemyFleet(SCREEN_WIDTH, game_state.level)
-    for enemy in enemy_fleet.enemies:
-        all_sprites.add(enemy)
-        enemies.add(enemy)
-    
+
+    renderer = make_renderer(screen, background, dirty_rects)
+
+    # All game rules live in the simulation; this loop reads input and draws.
+    # The simulation runs on its own fixed 1/FPS time step.
+    # The next level's fleet is prepared in the background during play.
+    simulation = Simulation(SCREEN_WIDTH, SCREEN_HEIGHT, step_ms=1000 / FPS,
+                            fleet_backend=fleet_backend, prefetch=True, swarm=swarm)
+    game_state = simulation.state
+    player = simulation.player
+
+    # Baked explosion frames are only drawn without the particle system
+    if simulation.particles is None:
+        preload_explosion_frames()
+
+    # Every input of the session goes to a replay file
+    recorder = ReplayRecorder(record, simulation) if record else None
+
+    # Opt-in per-phase frame timings; F3 toggles the overlay
+    if profile or profile_csv:
+        phases = (['events'] + [name for name, _ in simulation.phases] +
+                  ['level_handoff', 'draw', 'hud', 'flip'])
+        profiler = FrameProfiler(phases, budget_ms=1000 / FPS, csv_path=profile_csv)
+        simulation.timer = profiler
+    else:
+        profiler = NullProfiler()
+
     # Main game loop
     running = True
     while running:
         # Keep the game running at the right speed
         clock.tick(FPS)
-        
+        profiler.begin_frame()
+
         # Process input/events
-        for event in pygame.event.get():
-            if event.type == QUIT:
-                running = False
-            elif event.type == KEYDOWN:
-                if event.key == K_ESCAPE:
+        fire = pause = False
+        with profiler.phase('events'):
+            for event in pygame.event.get():
+                if event.type == QUIT:
                     running = False
-                elif event.key == K_p:
-                    game_state.paused = not game_state.paused
-                elif event.key == K_SPACE and not game_state.paused and not game_state.game_over:
-                    bullet = player.shoot()
-                    if bullet:
-                        all_sprites.add(bullet)
-                        player_bullets.add(bullet)
-        
-        # Skip updates if game is paused
+                elif event.type in EXPOSE_EVENTS:
+                    # A covered or minimized window lost what dirty rects skip
+                    renderer.invalidate()
+                elif event.type == KEYDOWN:
+                    if event.key == K_ESCAPE:
+                        running = False
+                    elif event.key == K_p:
+                        pause = True
+                    elif event.key == K_SPACE:
+                        fire = True
+                    elif event.key == K_F3:
+                        profiler.toggle_overlay()
+
+        # Advance the game by one tick; pausing is an input too, so that
+        # replays capture it. Nothing else happens while paused or over.
+        simulation.step(Inputs.from_keys(pygame.key.get_pressed(), fire, pause))
+
+        # Show the frozen game while paused
         if game_state.paused:
             # Draw everything
-            screen.blit(background, (0, 0))
-            all_sprites.draw(screen)
-            player.draw(screen)  # Draw player with shield if active
-            draw_text(screen, "PAUSED", 64, SCREEN_WIDTH//2, SCREEN_HEIGHT//2, WHITE)
-            draw_text(screen, f"Score: {game_state.score}", 22, SCREEN_WIDTH//2, 10, WHITE)
-            draw_text(screen, f"Lives: {game_state.lives}", 22, 50, 10, WHITE)
-            draw_text(screen, f"Level: {game_state.level}", 22, SCREEN_WIDTH-50, 10, WHITE)
-            pygame.display.flip()
+            renderer.begin()
+            draw_world(renderer, simulation)
+            draw_text(renderer, "PAUSED", 64, SCREEN_WIDTH//2, SCREEN_HEIGHT//2, WHITE)
+            draw_hud(renderer, game_state)
+            renderer.present()
             continue
-            
+
         if game_state.game_over:
             # Draw game over screen
-            screen.blit(background, (0, 0))
-            draw_text(screen, "GAME OVER", 64, SCREEN_WIDTH//2, SCREEN_HEIGHT//2, RED)
-            draw_text(screen, f"Final Score: {game_state.score}", 36, SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 70, WHITE)
-            draw_text(screen, "Press ESC to exit", 22, SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 120, WHITE)
-            pygame.display.flip()
+            renderer.begin()
+            draw_text(renderer, "GAME OVER", 64, SCREEN_WIDTH//2, SCREEN_HEIGHT//2, RED)
+            draw_text(renderer, f"Final Score: {game_state.score}", 36, SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 70, WHITE)
+            draw_text(renderer, "Press ESC to exit", 22, SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 120, WHITE)
+            renderer.present()
             continue
-        
-        # Update all game objects
-        all_sprites.update()
-        
-        # Enemy shooting logic
-        for enemy in enemies:
-            if random.random() < 0.005 * game_state.level:  # Chance increases with level
-                bullet = enemy.shoot()
-                if bullet:
-                    all_sprites.add(bullet)
-                    enemy_bullets.add(bullet)
-        
-        # Random power-up spawning (increased probability)
-        if random.random() < 0.01 * game_state.level:  # Much higher chance (10x more frequent)
-            powerup_type = random.choice(["shield", "rocket"])
-            x = random.randint(50, SCREEN_WIDTH - 50)
-            powerup = PowerUp(x, 0, powerup_type)
-            all_sprites.add(powerup)
-            powerups.add(powerup)
-        
-        # Check for collisions between player bullets and enemies
-        hits = pygame.sprite.groupcollide(enemies, player_bullets, True, True)
-        for hit in hits:
-            game_state.score += 100
-            explosion = Explosion(hit.rect.center)
-            all_sprites.add(explosion)
-            explosions.add(explosion)
-        
-        # Check for collisions between rockets and enemies
-        hits = pygame.sprite.groupcollide(enemies, rockets, False, True)
-        for enemy, rocket_list in hits.items():
-            for rocket in rocket_list:
-                # Create rocket explosion
-                explosion = RocketExplosion(rocket.explode())
-                all_sprites.add(explosion)
-                explosions.add(explosion)
-                
-                # Damage all enemies within explosion radius
-                for target in enemies:
-                    # Calculate distance between explosion and enemy
-                    distance = pygame.math.Vector2(target.rect.center).distance_to(
-                        pygame.math.Vector2(explosion.rect.center))
-                    
-                    if distance < explosion.size / 2:  # If within explosion radius
-                        target.kill()
-                        game_state.score += 100
-                        # Create smaller explosion for each affected enemy
-                        small_explosion = Explosion(target.rect.center)
-                        all_sprites.add(small_explosion)
-                        explosions.add(small_explosion)
-        
-        # Check for collisions between enemy bullets and player
-        if not player.is_shielded():  # Only check if shield is not active
-            hits = pygame.sprite.spritecollide(player, enemy_bullets, True)
-            if hits:
-                game_state.lives -= 1
-                explosion = Explosion(player.rect.center)
-                all_sprites.add(explosion)
-                explosions.add(explosion)
-                player.reset_position()
-                if game_state.lives <= 0:
-                    game_state.game_over = True
-        else:
-            # If shield is active, destroy enemy bullets that hit the shield
-            hits = pygame.sprite.spritecollide(player, enemy_bullets, True)
-        
-        # Check for direct collisions between player and enemies
-        if not player.is_shielded():  # Only check if shield is not active
-            hits = pygame.sprite.spritecollide(player, enemies, True)
-            if hits:
-                game_state.lives -= 1
-                explosion = Explosion(player.rect.center)
-                all_sprites.add(explosion)
-                explosions.add(explosion)
-                player.reset_position()
-                if game_state.lives <= 0:
-                    game_state.game_over = True
-        else:
-            # If shield is active, destroy enemies that hit the shield
-            hits = pygame.sprite.spritecollide(player, enemies, True)
-            for hit in hits:
-                explosion = Explosion(hit.rect.center)
-                all_sprites.add(explosion)
-                explosions.add(explosion)
-                game_state.score += 50
-        
-        # Check for collisions between player and power-ups
-        hits = pygame.sprite.spritecollide(player, powerups, False)
-        for hit in hits:
-            if hit.powerup_type == "shield":
-                player.activate_shield()
-                hit.apply(player, game_state)
-            elif hit.powerup_type == "rocket":
-                rocket = player.fire_rocket()
-                all_sprites.add(rocket)
-                rockets.add(rocket)
-                hit.apply(player, game_state)
-        
-        # If all enemies are destroyed, advance to next level
-        if len(enemies) == 0:
-            game_state.level += 1
-            enemy_fleet = EnemyFleet(SCREEN_WIDTH, game_state.level)
-            for enemy in enemy_fleet.enemies:
-                all_sprites.add(enemy)
-                enemies.add(enemy)
-        
+
         # Draw everything
-        screen.blit(background, (0, 0))
-        all_sprites.draw(screen)
-        player.draw(screen)  # Draw player with shield if active
-        
+        with profiler.phase('draw'):
+            renderer.begin()
+            draw_world(renderer, simulation)
+
         # Draw HUD
-        draw_text(screen, f"Score: {game_state.score}", 22, SCREEN_WIDTH//2, 10, WHITE)
-        draw_text(screen, f"Lives: {game_state.lives}", 22, 50, 10, WHITE)
-        draw_text(screen, f"Level: {game_state.level}", 22, SCREEN_WIDTH-50, 10, WHITE)
-        
-        # Show shield timer if active
-        if player.shield_active:
-            shield_time_left = (player.shield_duration - (pygame.time.get_ticks() - player.shield_time)) // 1000
-            draw_text(screen, f"Shield: {shield_time_left}s", 18, 150, 10, (100, 200, 255))
-        
-        # Flip the display
-        pygame.display.flip()
-    
+        with profiler.phase('hud'):
+            draw_hud(renderer, game_state)
+
+            # Show shield timer if active
+            if player.shield_active:
+                shield_time_left = player.shield_time_left() // 1000
+                draw_text(renderer, f"Shield: {shield_time_left}s", 18, 150, 10, (100, 200, 255))
+
+            profiler.draw_overlay(renderer)
+
+        # Submit the queued layers, then flip the display (or push the changed rects)
+        with profiler.phase('draw'):
+            renderer.flush()
+        with profiler.phase('flip'):
+            renderer.present()
+        profiler.end_frame()
+
     # Quit the game
+    if recorder is not None:
+        recorder.close()
+    simulation.close()
+    profiler.close()
+    pygame.quit()
+    sys.exit()
+
+# Replay playback speeds: key -> ticks per frame (None: as many as fit in a frame)
+REPLAY_SPEEDS = {K_1: 1, K_8: 8, K_m: None}
+
+# Ticks skipped by one press of the seek keys (10 seconds)
+REPLAY_SEEK_TICKS = 10 * FPS
+
+def watch_replay(path, speed=1, dirty_rects=False):
+    """
+    Play back a recorded session in the window
+
+    1 and 8 switch between 1x and 8x speed, M runs unthrottled, Left/Right
+    seek 10 seconds back/forward and ESC quits.
+
+    Args:
+        path (str): Replay file written by a recorded session
+        speed (int, optional): Starting ticks per frame; None for unthrottled
+        dirty_rects (bool): Use the dirty-rect renderer
+    """
+    screen, background = init_display()
+    clock = pygame.time.Clock()
+    renderer = make_renderer(screen, background, dirty_rects)
+    replay = Replay.load(path)
+    player = ReplayPlayer(replay)
+    if player.simulation.particles is None:
+        preload_explosion_frames()
+
+    running = True
+    while running:
+        clock.tick(FPS)
+        for event in pygame.event.get():
+            if event.type == QUIT:
+                running = False
+            elif event.type in EXPOSE_EVENTS:
+                renderer.invalidate()
+            elif event.type == KEYDOWN:
+                if event.key == K_ESCAPE:
+                    running = False
+                elif event.key in REPLAY_SPEEDS:
+                    speed = REPLAY_SPEEDS[event.key]
+                elif event.key == K_LEFT:
+                    player.seek(player.position - REPLAY_SEEK_TICKS)
+                elif event.key == K_RIGHT:
+                    player.seek(player.position + REPLAY_SEEK_TICKS)
+
+        if speed is None:
+            # Unthrottled: simulate for about one frame's worth of wall time
+            deadline = time.perf_counter() + 1 / FPS
+            while not player.finished and time.perf_counter() < deadline:
+                player.step(FPS)
+        else:
+            player.step(speed)
+
+        simulation = player.simulation
+        renderer.begin()
+        draw_world(renderer, simulation)
+        draw_hud(renderer, simulation.state)
+        label = 'max' if speed is None else f"{speed}x"
+        status = "END" if player.finished else f"{player.position}/{len(replay)}"
+        draw_text(renderer, f"Replay {label}  {status}", 18, SCREEN_WIDTH//2, 40, GREEN)
+        renderer.present()
+
+    player.simulation.close()
     pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Galaxian")
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help='only redraw and push the parts of the screen that changed')
+    parser.add_argument('--profile', action='store_true',
+                        help='time each phase of the frame (F3 shows the overlay)')
+    parser.add_argument('--profile-csv', metavar='FILE',
+                        help='write per-frame phase timings to a CSV file')
+    parser.add_argument('--fleet-backend', choices=['sprites', 'numpy'], default='sprites',
+                        help='move the enemy formation per sprite or with NumPy arrays')
+    parser.add_argument('--swarm', type=int, metavar='N',
+                        help='swarm mode: N small enemies per level (needs numpy)')
+    parser.add_argument('--record', metavar='FILE',
+                        default=time.strftime('replays/session-%Y%m%d-%H%M%S.gxr'),
+                        help='replay file for this session (default: a new file in replays/)')
+    parser.add_argument('--no-record', action='store_true', help='do not record a replay')
+    parser.add_argument('--replay', metavar='FILE', help='watch a recorded session instead of playing')
+    parser.add_argument('--speed', choices=['1', '8', 'max'], default='1',
+                        help='replay speed: 1x, 8x or unthrottled')
+    args = parser.parse_args()
+    if args.swarm is not None and args.swarm < 1:
+        parser.error('--swarm needs at least one enemy')
+    if args.replay:
+        watch_replay(args.replay, None if args.speed == 'max' else int(args.speed),
+                     dirty_rects=args.dirty_rects)
+    main(dirty_rects=args.dirty_rects, profile=args.profile, profile_csv=args.profile_csv,
+         fleet_backend=args.fleet_backend, swarm=args.swarm,
+         record=None if args.no_record else args.record)
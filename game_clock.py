@@ -0,0 +1,34 @@
+"""
+Clocks for the Galaxian game
+
+Entities read time through a clock object instead of calling
+pygame.time.get_ticks() directly, so a simulation can run on its own
+fixed-step time base, faster than real time and reproducibly.
+"""
+import pygame
+
+class WallClock:
+    """Real time in milliseconds since pygame.init()"""
+    def get_ticks(self):
+        return pygame.time.get_ticks()
+
+
+class SimClock:
+    """Simulation time in milliseconds, advanced one fixed step at a time"""
+    def __init__(self, step_ms=1000 / 60, start_ms=0):
+        self.step_ms = step_ms
+        self.time = start_ms
+
+    def get_ticks(self):
+        return int(self.time)
+
+    def advance(self, ms=None):
+        """Move time forward by one step (or by ms milliseconds)"""
+        self.time += self.step_ms if ms is None else ms
+
+    def reset(self, start_ms=0):
+        self.time = start_ms
+
+
+# Default for entities created without an explicit clock
+wall_clock = WallClock()
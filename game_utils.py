@@ -3,42 +3,303 @@ Utility functions for the Galaxian game
 """
 import pygame
 import os
+import json
+from collections import OrderedDict
 
-def load_image(path, width=None, height=None):
+class ImageCache:
+    """
+    Process-wide cache of decoded surfaces
+
+    Surfaces are keyed on (path, size, conversion mode) and shared between
+    every caller that asks for the same key, so they must be treated as
+    immutable. Copy a surface before drawing on it.
+    """
+    def __init__(self):
+        self._surfaces = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, width=None, height=None, convert='alpha'):
+        """
+        Return the cached surface for a key, decoding it on a miss
+
+        Args:
+            path (str): Path to the image file
+            width (int, optional): Width to resize to
+            height (int, optional): Height to resize to
+            convert (str, optional): 'alpha' for convert_alpha, 'opaque' for
+                convert, or None to keep the decoded pixel format
+
+        Returns:
+            pygame.Surface: The shared surface
+        """
+        if convert and pygame.display.get_surface() is None:
+            # Headless: there is no display format to convert to
+            convert = None
+        size = (width, height) if width and height else None
+        key = (path, size, convert)
+        image = self._surfaces.get(key)
+        if image is not None:
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = pygame.image.load(path)
+        if convert == 'alpha':
+            image = image.convert_alpha()
+        elif convert == 'opaque':
+            image = image.convert()
+        if size:
+            image = pygame.transform.scale(image, size)
+        self._surfaces[key] = image
+        return image
+
+    def preload(self, specs):
+        """
+        Decode a batch of images ahead of time
+
+        Args:
+            specs (iterable): (path, width, height) tuples, optionally with a
+                fourth conversion mode element
+
+        Returns:
+            int: Number of images that are now cached
+        """
+        loaded = 0
+        for spec in specs:
+            try:
+                self.get(*spec)
+                loaded += 1
+            except (pygame.error, FileNotFoundError) as e:
+                print(f"Error preloading image {spec[0]}: {e}")
+        return loaded
+
+    def evict(self, path=None):
+        """
+        Drop cached surfaces
+
+        Args:
+            path (str, optional): Only drop entries for this file. Everything
+                is dropped if omitted.
+        """
+        if path is None:
+            self._surfaces.clear()
+        else:
+            for key in [key for key in self._surfaces if key[0] == path]:
+                del self._surfaces[key]
+
+    def stats(self):
+        """Return hit/miss counters and the number of cached surfaces"""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._surfaces)}
+
+
+# Shared by every entity in the process
+image_cache = ImageCache()
+
+def load_image(path, width=None, height=None, convert='alpha'):
     """
     Load an image and optionally resize it
+
+    The result comes from the process-wide image cache, so repeated loads of
+    the same key cost no disk I/O. Do not draw on the returned surface.
     
     Args:
         path (str): Path to the image file
         width (int, optional): Width to resize to
         height (int, optional): Height to resize to
+        convert (str, optional): Conversion mode, 'alpha' (default),
+            'opaque' or None
         
     Returns:
         pygame.Surface: The loaded (and possibly resized) image
     """
     try:
-        image = pygame.image.load(path).convert_alpha()
-        if width and height:
-            image = pygame.transform.scale(image, (width, height))
-        return image
+        return image_cache.get(path, width, height, convert)
     except pygame.error as e:
         print(f"Error loading image {path}: {e}")
         raise
 
+class SpriteAtlas:
+    """
+    Packed texture atlas written by assets_creator.py
+
+    The atlas image is decoded once and named sprites are handed out as
+    subsurfaces of it. Resized sprites are scaled once and cached.
+    """
+    def __init__(self, index_path='assets/atlas.json'):
+        self.index_path = index_path
+        self._rects = None
+        self._image = None
+        self._sprites = {}
+
+    def _load(self):
+        """
+        Read the JSON index and the atlas image
+
+        A failure is reported and leaves the atlas empty, so sprites fall
+        back to their own image files.
+        """
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+            image_path = os.path.join(os.path.dirname(self.index_path), index['image'])
+            self._image = load_image(image_path)
+            self._rects = {name: pygame.Rect(rect) for name, rect in index['sprites'].items()}
+        except (OSError, ValueError, KeyError, TypeError, pygame.error) as e:
+            print(f"Error loading sprite atlas {self.index_path}: {e}; using individual images")
+            self._image = None
+            self._rects = {}
+
+    def names(self):
+        """Return the names of every sprite in the atlas"""
+        if self._rects is None:
+            self._load()
+        return list(self._rects)
+
+    def get(self, name, width=None, height=None):
+        """
+        Get a named sprite from the atlas
+        
+        Args:
+            name (str): Sprite name from the atlas index
+            width (int, optional): Width to resize to
+            height (int, optional): Height to resize to
+            
+        Returns:
+            pygame.Surface: The shared sprite, or None if it is not in the atlas
+        """
+        if self._rects is None:
+            self._load()
+        rect = self._rects.get(name)
+        if rect is None:
+            return None
+        
+        size = (width, height) if width and height else rect.size
+        key = (name, size)
+        image = self._sprites.get(key)
+        if image is None:
+            image = self._image.subsurface(rect)
+            if size != rect.size:
+                image = pygame.transform.scale(image, size)
+            self._sprites[key] = image
+        return image
+
+
+# Shared by every entity in the process
+sprite_atlas = SpriteAtlas()
+
+def load_sprite(name, width=None, height=None):
+    """
+    Load a named sprite from the atlas, falling back to assets/<name>.png
+    
+    Args:
+        name (str): Sprite name
+        width (int, optional): Width to resize to
+        height (int, optional): Height to resize to
+        
+    Returns:
+        pygame.Surface: The shared sprite image
+    """
+    image = sprite_atlas.get(name, width, height)
+    if image is None:
+        image = load_image(f'assets/{name}.png', width, height)
+    return image
+
+def preload_sprites(specs):
+    """
+    Load a batch of sprites ahead of time
+    
+    Args:
+        specs (iterable): (name, width, height) tuples
+    """
+    for spec in specs:
+        try:
+            load_sprite(*spec)
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Error preloading sprite {spec[0]}: {e}")
+
+class TextCache:
+    """
+    Font registry and rendered-text cache
+
+    Fonts are created once per size. Rendered labels are keyed on
+    (text, size, color) and kept in LRU order, so a HUD label is only
+    re-rendered when its string or colour changes.
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._fonts = {}
+        self._rendered = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def font(self, size):
+        """Return the shared default font for a point size"""
+        font = self._fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(pygame.font.get_default_font(), size)
+            self._fonts[size] = font
+        return font
+
+    def render(self, text, size, color):
+        """
+        Return a rendered label, rendering it only on a cache miss
+
+        Args:
+            text (str): Text to render
+            size (int): Font size
+            color (tuple): RGB color tuple
+
+        Returns:
+            pygame.Surface: The shared rendered label
+        """
+        key = (text, size, tuple(color))
+        surface = self._rendered.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._rendered.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.font(size).render(text, True, color)
+        self._rendered[key] = surface
+        if len(self._rendered) > self.max_entries:
+            self._rendered.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        """Drop every rendered label (fonts are kept)"""
+        self._rendered.clear()
+
+    def stats(self):
+        """Return hit/miss/eviction counters and cache sizes"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._rendered),
+            'fonts': len(self._fonts)
+        }
+
+
+# Shared by every draw_text call in the process
+text_cache = TextCache()
+
 def draw_text(surface, text, size, x, y, color):
     """
     Draw text on a surface
     
     Args:
-        surface (pygame.Surface): Surface to draw on
+        surface (pygame.Surface): Surface (or renderer) to draw on
         text (str): Text to draw
         size (int): Font size
         x (int): X coordinate (center of text)
         y (int): Y coordinate (top of text)
         color (tuple): RGB color tuple
     """
-    font = pygame.font.Font(pygame.font.get_default_font(), size)
-    text_surface = font.render(text, True, color)
+    text_surface = text_cache.render(text, size, color)
     text_rect = text_surface.get_rect()
     text_rect.midtop = (x, y)
     surface.blit(text_surface, text_rect)
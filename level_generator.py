@@ -2,9 +2,10 @@ import random
 import math
 
 class LevelGenerator:
-    def __init__(self, screen_width, screen_height):
+    def __init__(self, screen_width, screen_height, rng=None):
         self.screen_width = screen_width
         self.screen_height = screen_height
+        self.rng = rng or random
         self.difficulty = 1
         
     def generate_level(self, level_number):
@@ -60,7 +61,7 @@ class LevelGenerator:
         available_formations = formations[:1 + min(level_number, len(formations) - 1)]
         
         # Choose a random formation from available ones
-        formation_type = random.choice(available_formations)
+        formation_type = self.rng.choice(available_formations)
         
         # Generate formation parameters
         if formation_type == 'standard_grid':
@@ -131,7 +132,7 @@ class LevelGenerator:
         
         # Select 1-3 patterns for this level
         num_patterns = min(1 + math.floor(level_number / 3), 3)
-        selected_patterns = random.sample(available_patterns, min(num_patterns, len(available_patterns)))
+        selected_patterns = self.rng.sample(available_patterns, min(num_patterns, len(available_patterns)))
         
         return selected_patterns
     
@@ -140,7 +141,7 @@ class LevelGenerator:
         events = []
         
         # Asteroid field (from level 2)
-        if level_number >= 2 and random.random() < 0.3:
+        if level_number >= 2 and self.rng.random() < 0.3:
             events.append({
                 'type': 'asteroid_field',
                 'density': min(0.1 + (level_number * 0.02), 0.3),  # 10-30% density
@@ -152,16 +153,16 @@ class LevelGenerator:
             events.append({
                 'type': 'boss',
                 'health': 10 + (level_number * 2),
-                'attack_pattern': random.choice(['sweep', 'barrage', 'minions'])
+                'attack_pattern': self.rng.choice(['sweep', 'barrage', 'minions'])
             })
         
         # Wormhole (from level 4)
-        if level_number >= 4 and random.random() < 0.2:
+        if level_number >= 4 and self.rng.random() < 0.2:
             events.append({
                 'type': 'wormhole',
                 'duration': 15,  # seconds
-                'position': (random.randint(100, self.screen_width - 100), 
-                             random.randint(100, self.screen_height // 2))
+                'position': (self.rng.randint(100, self.screen_width - 100), 
+                             self.rng.randint(100, self.screen_height // 2))
             })
             
         return events
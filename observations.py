@@ -0,0 +1,225 @@
+"""
+Agent observations for the Galaxian game
+
+FeatureObservation reads a compact, fixed-size feature vector straight from
+a Simulation's sprite groups without rendering anything. FrameObservation
+exposes a rendered surface as a NumPy array: a zero-copy surfarray view, or
+a downsampled and optionally grayscale copy written into a preallocated
+buffer. RenderedObservation pairs a FrameObservation with an offscreen
+renderer so headless simulations can be observed as pixels too.
+"""
+from contextlib import contextmanager
+from itertools import islice
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only observations need it
+    np = None
+
+from game_utils import load_image
+from renderer import BatchRenderer, draw_world
+
+# Value of every coordinate of an empty slot in a feature array
+EMPTY = -1.0
+
+# Integer luma weights (ITU-R BT.601) that sum to 256
+GRAY_WEIGHTS = (77, 150, 29)
+
+POWERUP_TYPES = {'shield': 0.0, 'rocket': 1.0}
+
+class FeatureObservation:
+    """
+    Fixed-size feature vector of a simulation
+
+    The vector holds the player's x position and shield state, then the
+    centers of up to max_enemies enemies, max_bullets enemy bullets (oldest,
+    and so lowest, first), max_bullets player bullets and max_powerups
+    power-ups (with their type). Coordinates are scaled to [0, 1] by the
+    screen size and empty slots are EMPTY.
+    """
+    def __init__(self, max_enemies=48, max_bullets=32, max_powerups=4, screen_width=800,
+                 screen_height=600):
+        if np is None:
+            raise ImportError("observations require numpy")
+        self.max_enemies = max_enemies
+        self.max_bullets = max_bullets
+        self.max_powerups = max_powerups
+        self._scale = np.array([1 / screen_width, 1 / screen_height], dtype=np.float32)
+
+        # Name -> slice of the vector
+        sizes = (('player_x', 1), ('shielded', 1), ('enemies', max_enemies * 2),
+                 ('enemy_bullets', max_bullets * 2), ('player_bullets', max_bullets * 2),
+                 ('powerups', max_powerups * 3))
+        self.slices = {}
+        start = 0
+        for name, size in sizes:
+            self.slices[name] = slice(start, start + size)
+            start += size
+        self.shape = (start,)
+        self.dtype = np.float32
+        self.buffer = np.empty(self.shape, dtype=self.dtype)
+
+    def _points(self, out, name, sprites, limit):
+        """Write up to limit sprite centers into the named block of out"""
+        block = out[self.slices[name]].reshape(limit, 2)
+        points = [sprite.rect.center for sprite in islice(sprites, limit)]
+        count = len(points)
+        if count:
+            block[:count] = points
+            block[:count] *= self._scale
+        block[count:] = EMPTY
+
+    def observe(self, simulation, out=None):
+        """
+        Read the features of a simulation's current tick
+
+        Args:
+            simulation (Simulation): Game to observe
+            out (numpy.ndarray, optional): Array of self.shape to fill
+                instead of the shared buffer
+
+        Returns:
+            numpy.ndarray: The filled array
+        """
+        if out is None:
+            out = self.buffer
+        player = simulation.player
+        out[0] = player.rect.centerx * self._scale[0]
+        out[1] = player.is_shielded()
+
+        arrays = simulation.enemy_fleet.arrays
+        if arrays is not None:
+            # Array fleets are read in bulk rather than sprite by sprite
+            block = out[self.slices['enemies']].reshape(self.max_enemies, 2)
+            slots = np.flatnonzero(arrays.alive)[:self.max_enemies]
+            count = len(slots)
+            block[:count, 0] = arrays.x[slots] + arrays.width[slots] // 2
+            block[:count, 1] = arrays.y[slots] + arrays.height[slots] // 2
+            block[:count] *= self._scale
+            block[count:] = EMPTY
+        else:
+            self._points(out, 'enemies', simulation.enemies, self.max_enemies)
+        self._points(out, 'enemy_bullets', simulation.enemy_bullets, self.max_bullets)
+        self._points(out, 'player_bullets', simulation.player_bullets, self.max_bullets)
+
+        block = out[self.slices['powerups']].reshape(self.max_powerups, 3)
+        powerups = list(islice(simulation.powerups, self.max_powerups))
+        for row, powerup in zip(block, powerups):
+            row[0] = powerup.rect.centerx * self._scale[0]
+            row[1] = powerup.rect.centery * self._scale[1]
+            row[2] = POWERUP_TYPES.get(powerup.powerup_type, EMPTY)
+        block[len(powerups):] = EMPTY
+        return out
+
+
+class FrameObservation:
+    """
+    Pixels of a surface as NumPy arrays
+
+    pixels() lends out a zero-copy (height, width, 3) view of the surface.
+    observe() writes the surface, optionally downsampled by taking every
+    downsample-th pixel and converted to 8-bit grayscale, into a
+    preallocated buffer without allocating per frame.
+    """
+    def __init__(self, surface, downsample=1, grayscale=False):
+        if np is None:
+            raise ImportError("observations require numpy")
+        self.surface = surface
+        self.downsample = downsample
+        self.grayscale = grayscale
+        width, height = surface.get_size()
+        size = (len(range(0, height, downsample)), len(range(0, width, downsample)))
+        self.shape = size if grayscale else size + (3,)
+        self.dtype = np.uint8
+        self.buffer = np.empty(self.shape, dtype=self.dtype)
+        self._luma = np.empty(size, dtype=np.uint16)
+        self._channel = np.empty(size, dtype=np.uint16)
+
+    @contextmanager
+    def pixels(self):
+        """
+        Borrow a zero-copy view of the surface's pixels
+
+        The surface stays locked, so nothing can be drawn onto it, until the
+        with block ends. Do not keep the view past it.
+
+        Yields:
+            numpy.ndarray: (height, width, 3) uint8 view
+        """
+        view = pygame.surfarray.pixels3d(self.surface)
+        try:
+            yield view.transpose(1, 0, 2)
+        finally:
+            del view
+
+    def observe(self, out=None):
+        """
+        Copy the surface into a buffer, downsampled and converted as configured
+
+        Args:
+            out (numpy.ndarray, optional): uint8 array of self.shape to fill
+                instead of the shared buffer
+
+        Returns:
+            numpy.ndarray: The filled array
+        """
+        if out is None:
+            out = self.buffer
+        step = self.downsample
+        with self.pixels() as pixels:
+            sampled = pixels[::step, ::step]
+            if not self.grayscale:
+                # One channel at a time is several times faster than copying
+                # the interleaved 3-byte pixels in one go
+                for channel in range(3):
+                    np.copyto(out[..., channel], sampled[..., channel])
+            else:
+                # Weighted sum in 16 bits, then divided by 256
+                luma, channel = self._luma, self._channel
+                np.multiply(sampled[..., 0], GRAY_WEIGHTS[0], out=luma, dtype=np.uint16)
+                np.multiply(sampled[..., 1], GRAY_WEIGHTS[1], out=channel, dtype=np.uint16)
+                luma += channel
+                np.multiply(sampled[..., 2], GRAY_WEIGHTS[2], out=channel, dtype=np.uint16)
+                luma += channel
+                luma >>= 8
+                np.copyto(out, luma, casting='unsafe')
+            del sampled
+        return out
+
+
+class RenderedObservation:
+    """
+    Frames of a headless simulation, drawn offscreen
+
+    Draws the game world (without the HUD) onto its own surface with a
+    BatchRenderer and observes it with a FrameObservation.
+    """
+    def __init__(self, downsample=1, grayscale=False, screen_width=800, screen_height=600):
+        screen = pygame.Surface((screen_width, screen_height))
+        try:
+            background = load_image('assets/background.png', screen_width, screen_height, convert='opaque')
+        except:
+            # Fallback to a black background if image loading fails
+            background = pygame.Surface((screen_width, screen_height))
+        self.renderer = BatchRenderer(screen, background)
+        self.frames = FrameObservation(screen, downsample, grayscale)
+        self.shape = self.frames.shape
+        self.dtype = self.frames.dtype
+
+    def observe(self, simulation, out=None):
+        """
+        Render a simulation's current tick and read it back
+
+        Args:
+            simulation (Simulation): Game to observe
+            out (numpy.ndarray, optional): Array of self.shape to fill
+
+        Returns:
+            numpy.ndarray: The filled array
+        """
+        self.renderer.begin()
+        draw_world(self.renderer, simulation)
+        self.renderer.flush()
+        return self.frames.observe(out)
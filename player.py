@@ -4,17 +4,25 @@ Player class for the Galaxian game
 import pygame
 from pygame.locals import *
 import random
-from bullet import Bullet
+from bullet import bullet_pool
 from powerup import Rocket
-from game_utils import load_image
+from game_utils import load_sprite
+from sound_bank import sound_bank
+from game_clock import wall_clock
+
+PLAYER_IMAGE = ('player_ship', 50, 40)
+SHIELD_IMAGE = ('shield_effect', 70, 60)
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, screen_width, screen_height):
+    def __init__(self, screen_width, screen_height, clock=None):
         pygame.sprite.Sprite.__init__(self)
         
+        # Time source for cooldowns and the shield timer
+        self.clock = clock or wall_clock
+        
         # Load player ship image
         try:
-            self.image = load_image('assets/player_ship.png', 50, 40)
+            self.image = load_sprite(*PLAYER_IMAGE)
         except:
             # Fallback to a simple shape if image loading fails
             self.image = pygame.Surface((50, 40))
@@ -32,48 +40,46 @@ class Player(pygame.sprite.Sprite):
         # Movement speed
         self.speed = 8
         
+        # Controls for the current tick (simulation.Inputs); the keyboard
+        # is read directly when this is None
+        self.controls = None
+        
         # Screen boundaries
         self.screen_width = screen_width
         self.screen_height = screen_height
         
         # Shooting cooldown
         self.shoot_delay = 250  # milliseconds
-        self.last_shot = pygame.time.get_ticks()
+        self.last_shot = self.clock.get_ticks()
         
         # Shield properties
         self.shield_active = False
         self.shield_time = 0
         self.shield_duration = 30000  # 30 seconds in milliseconds
         
-        # Create a more visible shield effect
-        self.shield_image = pygame.Surface((70, 60), pygame.SRCALPHA)
-        # Draw shield bubble with bright blue color
-        pygame.draw.ellipse(self.shield_image, (0, 150, 255, 120), (0, 0, 70, 60))
-        pygame.draw.ellipse(self.shield_image, (100, 200, 255, 80), (5, 5, 60, 50))
-        # Add highlight
-        pygame.draw.arc(self.shield_image, (255, 255, 255, 150), (5, 5, 60, 50), 0.5, 2.5, 3)
-        
-        # Sound effects
+        # Shield bubble drawn around the ship
         try:
-            self.shoot_sound = pygame.mixer.Sound('assets/laser.wav')
-            self.shoot_sound.set_volume(0.4)
-            self.shield_sound = pygame.mixer.Sound('assets/shield.wav')
-            self.shield_sound.set_volume(0.5)
-            self.rocket_sound = pygame.mixer.Sound('assets/rocket_launch.wav')
-            self.rocket_sound.set_volume(0.6)
+            self.shield_image = load_sprite(*SHIELD_IMAGE)
         except:
-            self.shoot_sound = None
-            self.shield_sound = None
-            self.rocket_sound = None
+            # Fallback to drawing the bubble if image loading fails
+            self.shield_image = pygame.Surface((70, 60), pygame.SRCALPHA)
+            pygame.draw.ellipse(self.shield_image, (0, 150, 255, 120), (0, 0, 70, 60))
+            pygame.draw.ellipse(self.shield_image, (100, 200, 255, 80), (5, 5, 60, 50))
+            pygame.draw.arc(self.shield_image, (255, 255, 255, 150), (5, 5, 60, 50), 0.5, 2.5, 3)
     
     def update(self):
         # Get pressed keys
-        keys = pygame.key.get_pressed()
+        if self.controls is not None:
+            left, right = self.controls.left, self.controls.right
+        else:
+            keys = pygame.key.get_pressed()
+            left = keys[K_LEFT] or keys[K_a]
+            right = keys[K_RIGHT] or keys[K_d]
         
         # Move left/right
-        if keys[K_LEFT] or keys[K_a]:
+        if left:
             self.rect.x -= self.speed
-        if keys[K_RIGHT] or keys[K_d]:
+        if right:
             self.rect.x += self.speed
         
         # Keep player on screen
@@ -84,7 +90,7 @@ class Player(pygame.sprite.Sprite):
         
         # Update shield if active
         if self.shield_active:
-            now = pygame.time.get_ticks()
+            now = self.clock.get_ticks()
             if now - self.shield_time > self.shield_duration:
                 self.shield_active = False
     
@@ -99,7 +105,7 @@ class Player(pygame.sprite.Sprite):
             shield_rect.center = self.rect.center
             
             # Add pulsating effect to make shield more visible
-            now = pygame.time.get_ticks()
+            now = self.clock.get_ticks()
             pulse = (now % 1000) / 1000  # Value between 0 and 1
             
             # Create a copy of the shield image with varying opacity
@@ -113,54 +119,35 @@ class Player(pygame.sprite.Sprite):
             surface.blit(shield_copy, shield_rect)
     
     def shoot(self):
-        now = pygame.time.get_ticks()
+        now = self.clock.get_ticks()
         if now - self.last_shot > self.shoot_delay:
             self.last_shot = now
-            bullet = Bullet(self.rect.centerx, self.rect.top, -10)  # -10 for upward movement
+            bullet = bullet_pool.acquire(self.rect.centerx, self.rect.top, -10)  # -10 for upward movement
             
             # Play sound if available
-            if self.shoot_sound:
-                self.shoot_sound.play()
+            sound_bank.play('laser')
                 
             return bullet
         return None
     
     def fire_rocket(self):
         """Fire a rocket that explodes and damages enemies in an area"""
-        # Create a more visible rocket
-        rocket_img = pygame.Surface((10, 30), pygame.SRCALPHA)
-        # Draw rocket body
-        pygame.draw.rect(rocket_img, (220, 20, 60), (2, 0, 6, 20))
-        pygame.draw.polygon(rocket_img, (220, 20, 60), [(2, 0), (5, -5), (8, 0)])
-        # Draw fins
-        pygame.draw.polygon(rocket_img, (169, 169, 169), [(0, 15), (2, 15), (2, 20)])
-        pygame.draw.polygon(rocket_img, (169, 169, 169), [(8, 15), (10, 15), (8, 20)])
-        # Draw flame
-        pygame.draw.polygon(rocket_img, (255, 165, 0), [(2, 20), (5, 30), (8, 20)])
-        pygame.draw.polygon(rocket_img, (255, 215, 0), [(3, 20), (5, 25), (7, 20)])
-        
-        rocket = Rocket(self.rect.centerx, self.rect.top)
-        rocket.image = rocket_img  # Replace with our custom image
-        
-        # Play sound if available
-        if self.rocket_sound:
-            self.rocket_sound.play()
-            
-        return rocket
+        return Rocket(self.rect.centerx, self.rect.top)
     
     def activate_shield(self):
         """Activate shield for protection"""
         self.shield_active = True
-        self.shield_time = pygame.time.get_ticks()
-        
-        # Play sound if available
-        if self.shield_sound:
-            self.shield_sound.play()
+        self.shield_time = self.clock.get_ticks()
+        sound_bank.play('shield')
     
     def is_shielded(self):
         """Check if shield is active"""
         return self.shield_active
     
+    def shield_time_left(self):
+        """Milliseconds of shield remaining"""
+        return self.shield_duration - (self.clock.get_ticks() - self.shield_time)
+    
     def reset_position(self):
         """Reset player position after being hit"""
         self.rect.centerx = self.screen_width // 2
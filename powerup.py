@@ -3,7 +3,11 @@ Power-up classes for the Galaxian game
 """
 import pygame
 import random
-from game_utils import load_image
+from game_utils import load_sprite
+from sound_bank import sound_bank
+
+ROCKET_IMAGE = ('rocket', 10, 30)
+POWERUP_IMAGES = {'shield': ('shield_powerup', 30, 30), 'rocket': ('rocket_powerup', 30, 30)}
 
 class PowerUp(pygame.sprite.Sprite):
     def __init__(self, x, y, powerup_type):
@@ -11,27 +15,27 @@ class PowerUp(pygame.sprite.Sprite):
         
         self.powerup_type = powerup_type
         
-        # Create more visible power-up images
-        self.image = pygame.Surface((30, 30), pygame.SRCALPHA)
+        # Pulsating glow effect
+        self.glow_size = 15
+        self.glow_direction = 1
         
-        if powerup_type == "shield":
-            # Blue shield icon with glow effect
-            pygame.draw.circle(self.image, (0, 100, 255), (15, 15), 15)
-            pygame.draw.circle(self.image, (100, 200, 255), (15, 15), 10)
-            pygame.draw.circle(self.image, (200, 230, 255), (15, 15), 5)
-            # Add pulsating effect
-            self.glow_size = 15
-            self.glow_direction = 1
-        else:  # rocket
-            # Red rocket icon with more detail
-            pygame.draw.rect(self.image, (255, 50, 50), (10, 5, 10, 20))
-            pygame.draw.polygon(self.image, (255, 100, 50), [(10, 5), (15, 0), (20, 5)])
-            pygame.draw.rect(self.image, (150, 150, 150), (8, 25, 14, 5))
-            # Add flame effect
-            pygame.draw.polygon(self.image, (255, 215, 0), [(12, 25), (15, 30), (18, 25)])
-            # Add pulsating effect
-            self.glow_size = 15
-            self.glow_direction = 1
+        try:
+            self.image = load_sprite(*POWERUP_IMAGES[powerup_type])
+        except:
+            # Fallback to drawing the icon if image loading fails
+            self.image = pygame.Surface((30, 30), pygame.SRCALPHA)
+            if powerup_type == "shield":
+                # Blue shield icon with glow effect
+                pygame.draw.circle(self.image, (0, 100, 255), (15, 15), 15)
+                pygame.draw.circle(self.image, (100, 200, 255), (15, 15), 10)
+                pygame.draw.circle(self.image, (200, 230, 255), (15, 15), 5)
+            else:  # rocket
+                # Red rocket icon with more detail
+                pygame.draw.rect(self.image, (255, 50, 50), (10, 5, 10, 20))
+                pygame.draw.polygon(self.image, (255, 100, 50), [(10, 5), (15, 0), (20, 5)])
+                pygame.draw.rect(self.image, (150, 150, 150), (8, 25, 14, 5))
+                # Add flame effect
+                pygame.draw.polygon(self.image, (255, 215, 0), [(12, 25), (15, 30), (18, 25)])
         
         self.rect = self.image.get_rect()
         self.rect.x = x
@@ -39,13 +43,6 @@ class PowerUp(pygame.sprite.Sprite):
         
         # Movement speed
         self.speed = 3
-        
-        # Sound effect
-        try:
-            self.pickup_sound = pygame.mixer.Sound('assets/powerup.wav')
-            self.pickup_sound.set_volume(0.4)
-        except:
-            self.pickup_sound = None
     
     def update(self):
         # Move downward
@@ -64,8 +61,7 @@ class PowerUp(pygame.sprite.Sprite):
     
     def apply(self, player, game_state):
         """Apply power-up effect to player"""
-        if self.pickup_sound:
-            self.pickup_sound.play()
+        sound_bank.play('powerup')
             
         if self.powerup_type == "shield":
             player.activate_shield()
@@ -83,7 +79,7 @@ class Rocket(pygame.sprite.Sprite):
         
         # Create rocket image
         try:
-            self.image = load_image('assets/rocket.png', 10, 30)
+            self.image = load_sprite(*ROCKET_IMAGE)
         except:
             self.image = pygame.Surface((10, 30), pygame.SRCALPHA)
             pygame.draw.rect(self.image, (255, 50, 50), (0, 0, 10, 20))
@@ -100,12 +96,7 @@ class Rocket(pygame.sprite.Sprite):
         self.explosion_radius = 100
         
         # Sound effect
-        try:
-            self.launch_sound = pygame.mixer.Sound('assets/rocket_launch.wav')
-            self.launch_sound.set_volume(0.5)
-            self.launch_sound.play()
-        except:
-            pass
+        sound_bank.play('rocket_launch')
     
     def update(self):
         # Move upward
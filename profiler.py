@@ -0,0 +1,139 @@
+"""
+Frame profiler for the Galaxian game
+
+Times each phase of the main loop, keeps rolling p50/p95/p99 per phase,
+draws an overlay and can stream one CSV row per frame. Frames that miss
+the budget record the phase that took longest.
+"""
+import csv
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+from game_utils import text_cache
+
+class FrameProfiler:
+    """
+    Per-phase frame timings
+
+    Wrap main-loop code in "with profiler.phase(name):" and set it as a
+    Simulation's timer to get the simulation phases too. Call begin_frame()
+    and end_frame() around each frame.
+    """
+    def __init__(self, phases, budget_ms=1000 / 60, window=300, csv_path=None):
+        self.phases = list(phases)
+        self.budget_ms = budget_ms
+        self.history = {name: deque(maxlen=window) for name in self.phases + ['frame']}
+        self.frame = 0
+        self.over_budget = 0
+        self.last_slow_frame = None
+        self.show_overlay = False
+        self._current = {}
+        self._frame_start = None
+
+        self._csv_file = None
+        self._csv = None
+        if csv_path:
+            self._csv_file = open(csv_path, 'w', newline='')
+            self._csv = csv.writer(self._csv_file)
+            self._csv.writerow(['frame', 'frame_ms'] + [f'{name}_ms' for name in self.phases])
+
+    def begin_frame(self):
+        self._current = {}
+        self._frame_start = time.perf_counter()
+
+    def record(self, name, seconds):
+        """Add a timing for a phase of the current frame"""
+        self._current[name] = self._current.get(name, 0.0) + seconds * 1000
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as the named phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def end_frame(self):
+        """Close the current frame, update statistics and write its CSV row"""
+        if self._frame_start is None:
+            return
+        frame_ms = (time.perf_counter() - self._frame_start) * 1000
+        self._frame_start = None
+        self.frame += 1
+
+        self.history['frame'].append(frame_ms)
+        for name in self.phases:
+            self.history[name].append(self._current.get(name, 0.0))
+
+        if frame_ms > self.budget_ms:
+            self.over_budget += 1
+            worst = max(self._current, key=self._current.get) if self._current else None
+            self.last_slow_frame = (self.frame, frame_ms, worst, self._current.get(worst, 0.0))
+
+        if self._csv:
+            self._csv.writerow([self.frame, f'{frame_ms:.3f}'] +
+                               [f'{self._current.get(name, 0.0):.3f}' for name in self.phases])
+
+    def percentiles(self, name):
+        """Return (p50, p95, p99) in milliseconds over the rolling window"""
+        ordered = sorted(self.history[name])
+        if not ordered:
+            return (0.0, 0.0, 0.0)
+        last = len(ordered) - 1
+        return tuple(ordered[min(last, int(fraction * len(ordered)))] for fraction in (0.50, 0.95, 0.99))
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+
+    def draw_overlay(self, surface, x=10, y=40):
+        """Draw the per-phase percentile table if the overlay is on"""
+        if not self.show_overlay:
+            return
+        rows = [('phase', 'p50', 'p95', 'p99')]
+        for name in ['frame'] + self.phases:
+            rows.append((name,) + tuple(f"{value:.2f}" for value in self.percentiles(name)))
+        rows.append((f"over {self.budget_ms:.1f} ms: {self.over_budget} of {self.frame} frames",))
+        if self.last_slow_frame:
+            frame, frame_ms, worst, worst_ms = self.last_slow_frame
+            rows.append((f"last slow #{frame} {frame_ms:.1f} ms: {worst} {worst_ms:.1f} ms",))
+
+        # Proportional font, so each column is blitted at its own offset
+        columns = (0, 180, 230, 280)
+        for i, row in enumerate(rows):
+            for column, cell in zip(columns, row):
+                label = text_cache.render(cell, 14, (255, 255, 0))
+                surface.blit(label, (x + column, y + i * 15))
+
+    def close(self):
+        if self._csv_file:
+            self._csv_file.close()
+            self._csv_file = None
+            self._csv = None
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off; every call is a no-op"""
+    show_overlay = False
+
+    def begin_frame(self):
+        pass
+
+    def record(self, name, seconds):
+        pass
+
+    def phase(self, name):
+        return nullcontext()
+
+    def end_frame(self):
+        pass
+
+    def toggle_overlay(self):
+        pass
+
+    def draw_overlay(self, surface, x=10, y=40):
+        pass
+
+    def close(self):
+        pass
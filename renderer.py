@@ -0,0 +1,205 @@
+"""
+Frame renderers for the Galaxian game
+
+All renderers expose a Surface-like blit() so that existing drawing code
+such as Player.draw and draw_text can draw through them unchanged.
+draw_world() draws a simulation's sprites through any of them.
+"""
+import pygame
+
+class Renderer:
+    """Full-frame renderer: redraws the whole background and flips every frame"""
+    def __init__(self, screen, background):
+        self.screen = screen
+        self.background = background
+
+    def begin(self):
+        """Start a new frame by clearing the screen to the background"""
+        self.screen.blit(self.background, (0, 0))
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        """Draw a surface onto the screen, like pygame.Surface.blit"""
+        return self.screen.blit(source, dest, area, special_flags)
+
+    def blits(self, blit_sequence, doreturn=True):
+        """Draw many (surface, dest) pairs in one call, like pygame.Surface.blits"""
+        return self.screen.blits(blit_sequence, doreturn)
+
+    def draw_group(self, group):
+        """Draw every sprite in a group"""
+        for sprite in group:
+            self.blit(sprite.image, sprite.rect)
+
+    def set_layer(self, name):
+        """Select the layer for following draws (only BatchRenderer orders by layer)"""
+
+    def flush(self):
+        """Draw anything still queued (only BatchRenderer queues draws)"""
+
+    def invalidate(self):
+        """Force the next frame to be redrawn and pushed in full"""
+
+    def present(self):
+        """Push the finished frame to the display"""
+        pygame.display.flip()
+
+
+class DirtyRectRenderer(Renderer):
+    """
+    Renderer that only touches the parts of the screen that changed
+
+    Each blit is recorded as an (image, rect) item. At the start of a frame
+    the background is restored only under the previous frame's items. On
+    present, only the rects of items that appeared or disappeared since the
+    previous frame are sent to pygame.display.update. Sprites that did not
+    move and HUD labels that did not change are not pushed again.
+    """
+    def __init__(self, screen, background):
+        super().__init__(screen, background)
+        self._previous = set()
+        self._current = set()
+        self._full_redraw = True
+        self.pushed_rects = 0
+
+    def begin(self):
+        if self._full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for _, rect in self._previous:
+                self.screen.blit(self.background, rect, rect)
+        self._current = set()
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        rect = self.screen.blit(source, dest, area, special_flags)
+        if rect.width and rect.height:
+            self._current.add((source, tuple(rect)))
+        return rect
+
+    def blits(self, blit_sequence, doreturn=True):
+        blit_sequence = list(blit_sequence)
+        rects = self.screen.blits(blit_sequence)
+        current = self._current
+        for item, rect in zip(blit_sequence, rects):
+            if rect.width and rect.height:
+                current.add((item[0], tuple(rect)))
+        return rects if doreturn else None
+
+    def invalidate(self):
+        self._full_redraw = True
+
+    def present(self):
+        if self._full_redraw:
+            pygame.display.flip()
+            self._full_redraw = False
+            self.pushed_rects = 0
+        else:
+            rects = [rect for _, rect in self._previous ^ self._current]
+            self.pushed_rects = len(rects)
+            if rects:
+                pygame.display.update(rects)
+        self._previous = self._current
+
+
+class BatchRenderer(Renderer):
+    """
+    Renderer that queues every draw and submits it in layer order
+
+    Blits go to the current layer (see set_layer) and nothing touches the
+    screen until flush() or present(). Each layer's single blits are then
+    grouped by image, in order of first use, followed by any sequences
+    passed to blits() as they were given, and the layer is drawn with one
+    Surface.blits call. The draw order is fixed by LAYERS rather than by
+    the order sprites were added to their groups.
+    """
+    LAYERS = ('background', 'enemies', 'projectiles', 'effects', 'player', 'hud')
+
+    def __init__(self, screen, background):
+        super().__init__(screen, background)
+        self._layers = {name: [] for name in self.LAYERS}
+        self._batches = {name: [] for name in self.LAYERS}
+        self._layer = self._layers['hud']
+        self._batch = self._batches['hud']
+        self.submitted = 0
+
+    def begin(self):
+        for name in self.LAYERS:
+            self._layers[name].clear()
+            self._batches[name].clear()
+        self._layers['background'].append((self.background, (0, 0)))
+        self.set_layer('hud')
+
+    def set_layer(self, name):
+        self._layer = self._layers[name]
+        self._batch = self._batches[name]
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        if area is None and not special_flags:
+            self._layer.append((source, dest))
+        else:
+            self._layer.append((source, dest, area, special_flags))
+        # Where the surface will land; the screen is not touched until present()
+        return pygame.Rect(dest[0], dest[1], *source.get_size())
+
+    def blits(self, blit_sequence, doreturn=True):
+        # Already batched by the caller (particles, swarm fleets), so it is
+        # submitted as given instead of being grouped again
+        self._batch.append(blit_sequence)
+        return None
+
+    def draw_group(self, group):
+        self._layer.extend((sprite.image, sprite.rect) for sprite in group)
+
+    def flush(self):
+        """Draw the queued layers onto the screen and empty them"""
+        blits = self.screen.blits
+        submitted = 0
+        for name in self.LAYERS:
+            items = self._layers[name]
+            batches = self._batches[name]
+            if not items and not batches:
+                continue
+            # Group by image, keeping each image's first position in the layer
+            by_image = {}
+            for item in items:
+                run = by_image.get(item[0])
+                if run is None:
+                    by_image[item[0]] = [item]
+                else:
+                    run.append(item)
+            items = [item for run in by_image.values() for item in run]
+            for batch in batches:
+                items.extend(batch)
+            blits(items, False)
+            submitted += len(items)
+            self._layers[name].clear()
+            batches.clear()
+        self.submitted = submitted
+
+    def present(self):
+        self.flush()
+        pygame.display.flip()
+
+
+def draw_world(renderer, simulation):
+    """Draw the game, one layer at a time; leaves the HUD layer selected"""
+    renderer.set_layer('enemies')
+    if simulation.swarm:
+        simulation.enemy_fleet.draw(renderer)
+    else:
+        renderer.draw_group(simulation.enemies)
+
+    renderer.set_layer('projectiles')
+    renderer.draw_group(simulation.player_bullets)
+    renderer.draw_group(simulation.enemy_bullets)
+    renderer.draw_group(simulation.rockets)
+    renderer.draw_group(simulation.powerups)
+
+    renderer.set_layer('effects')
+    if simulation.particles is not None:
+        simulation.particles.draw(renderer)
+    else:
+        renderer.draw_group(simulation.explosions)
+
+    renderer.set_layer('player')
+    simulation.player.draw(renderer)  # Draw player with shield if active
+    renderer.set_layer('hud')
@@ -0,0 +1,461 @@
+"""
+Headless game simulation for the Galaxian game
+
+The Simulation owns every sprite group, the GameState and the enemy fleet,
+and advances the rules one tick per step() call without touching the
+display. galaxian.main() is a renderer over it.
+"""
+import pygame
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pygame.locals import *
+
+from player import Player
+from enemy import EnemyFleet
+from explosion import Explosion, RocketExplosion
+from powerup import PowerUp
+from game_clock import SimClock
+from spatial_hash import SpatialHash
+from fire_scheduler import FireScheduler
+from formations import swarm_formation
+from particles import ParticleSystem
+from snapshot import Snapshot
+
+# Enemy sprite size and default enemy bullet cap in swarm mode
+SWARM_ENEMY_SIZE = 12
+SWARM_MAX_ENEMY_BULLETS = 60
+
+# Bits of a one-byte input mask, as used by agents, vector environments
+# and replays
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_FIRE = 4
+INPUT_PAUSE = 8
+
+# Game state
+class GameState:
+    def __init__(self):
+        self.score = 0
+        self.level = 1
+        self.lives = 3
+        self.game_over = False
+        self.paused = False
+
+
+class GameStats:
+    """Counters of notable events in one game, for analytics"""
+    def __init__(self):
+        self.bullet_kills = 0
+        self.rocket_kills = 0
+        self.shield_kills = 0
+        self.shield_pickups = 0
+        self.rocket_pickups = 0
+        # Level -> lives lost on that level
+        self.deaths = {}
+
+
+class Inputs:
+    """Player controls for a single simulation tick; pause toggles pausing"""
+    __slots__ = ('left', 'right', 'fire', 'pause')
+
+    def __init__(self, left=False, right=False, fire=False, pause=False):
+        self.left = left
+        self.right = right
+        self.fire = fire
+        self.pause = pause
+
+    @classmethod
+    def from_keys(cls, keys, fire=False, pause=False):
+        """Build inputs from a pygame.key.get_pressed() result"""
+        return cls(left=bool(keys[K_LEFT] or keys[K_a]),
+                   right=bool(keys[K_RIGHT] or keys[K_d]),
+                   fire=fire, pause=pause)
+
+    @classmethod
+    def from_bits(cls, bits):
+        """Build inputs from an INPUT_* bit mask"""
+        return cls(left=bool(bits & INPUT_LEFT),
+                   right=bool(bits & INPUT_RIGHT),
+                   fire=bool(bits & INPUT_FIRE),
+                   pause=bool(bits & INPUT_PAUSE))
+
+    def to_bits(self):
+        """Pack these inputs into an INPUT_* bit mask"""
+        return ((INPUT_LEFT if self.left else 0) |
+                (INPUT_RIGHT if self.right else 0) |
+                (INPUT_FIRE if self.fire else 0) |
+                (INPUT_PAUSE if self.pause else 0))
+
+
+class Simulation:
+    """
+    Game rules without rendering
+
+    Call step() once per tick. Nothing here reads the keyboard or draws,
+    so any number of simulations can run without a window. Time comes from
+    a SimClock that advances step_ms per tick and all randomness from
+    streams seeded with seed, so two simulations with the same seed fed the
+    same inputs play identical games, as fast as the CPU can step them.
+
+    Setting timer to an object with a record(phase, seconds) method times
+    each named phase of step(), plus 'level_handoff' for every fleet swap.
+    Setting recorder to an object with a record(inputs) method (such as a
+    ReplayRecorder) hands it the inputs of every step() before game over,
+    paused ticks included.
+    """
+    def __init__(self, screen_width=800, screen_height=600, level=1, seed=None, step_ms=1000 / 60,
+                 fleet_backend='sprites', max_enemy_bullets=None, particles=True, prefetch=False,
+                 swarm=None, formation=None):
+        """
+        Initialize a simulation and start a game
+
+        Args:
+            screen_width (int): Width of the playing field
+            screen_height (int): Height of the playing field
+            level (int): Starting level
+            seed (int, optional): Seed for the random streams
+            step_ms (float): Game time per tick in milliseconds
+            fleet_backend (str): 'sprites' for one Enemy.update() per
+                sprite or 'numpy' for the vectorized FleetArrays backend
+            max_enemy_bullets (int, optional): Cap on enemy bullets in
+                flight, enforced by the FireScheduler
+            particles (bool): Let explosions emit into one ParticleSystem
+                (self.particles) when numpy is available. Otherwise they
+                animate as sprites and self.particles is None.
+            prefetch (bool): Build the next level's fleet on a worker thread
+                while the current level is played; call close() to stop it
+            swarm (int, optional): Replace every level's formation with a
+                dense block of this many small enemies. They use the numpy
+                backend and are kept out of all_sprites (draw them with
+                enemy_fleet.draw()), and enemy bullets are capped at
+                SWARM_MAX_ENEMY_BULLETS unless max_enemy_bullets is given.
+            formation (dict, optional): Fixed formation parameters (see
+                formations.py) for every level instead of LevelGenerator's,
+                so the workload does not depend on the seed. Replays cannot
+                record it.
+        """
+        self._configure(screen_width, screen_height, step_ms, fleet_backend, max_enemy_bullets,
+                        particles, prefetch, swarm, formation)
+        self.reset(level, seed)
+
+    def _configure(self, screen_width, screen_height, step_ms, fleet_backend, max_enemy_bullets,
+                   particles, prefetch, swarm, formation):
+        """Set up everything but the game itself, which reset() or a Snapshot fills in"""
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.swarm = swarm
+        self.formation = formation
+        if swarm:
+            fleet_backend = 'numpy'
+            if max_enemy_bullets is None:
+                max_enemy_bullets = SWARM_MAX_ENEMY_BULLETS
+        self.fleet_backend = fleet_backend
+        self.use_particles = particles
+        self.clock = SimClock(step_ms)
+        self.rng = random.Random()
+        self.timer = None
+        self.recorder = None
+        self.fire_scheduler = FireScheduler(self.rng, max_enemy_bullets)
+
+        # Next level's fleet being built in the background: (level, future)
+        self._prefetcher = None
+        if prefetch:
+            self._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='level-prefetch')
+        self._next_fleet = None
+        self.handoff_ms = None
+
+        # Broadphase shared by every collision query of a tick
+        self.grid = SpatialHash()
+
+        # (name, method) pairs run by step(), in order
+        self.phases = (
+            ('update', self._update_sprites),
+            ('enemy_fire', self._enemy_fire),
+            ('powerup_spawn', self._spawn_random_powerup),
+            ('broadphase', self._rebuild_grid),
+            ('bullets_vs_enemies', self._collide_bullets_with_enemies),
+            ('rockets_vs_enemies', self._collide_rockets_with_enemies),
+            ('enemy_bullets_vs_player', self._collide_enemy_bullets_with_player),
+            ('enemies_vs_player', self._collide_enemies_with_player),
+            ('powerup_pickup', self._collect_powerups),
+            ('level_advance', self._advance_level)
+        )
+
+    def reset(self, level=1, seed=None):
+        """
+        Start a new game at the given level
+
+        Args:
+            level (int): Starting level
+            seed (int, optional): Seed for the random stream. A fresh
+                random seed is drawn if omitted.
+        """
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng.seed(self.seed)
+        self.clock.reset()
+        self.state = GameState()
+        self.state.level = level
+        self.stats = GameStats()
+        self.ticks = 0
+
+        # Explosion particles, when numpy is available
+        self.particles = None
+        if self.use_particles:
+            try:
+                self.particles = ParticleSystem(seed=self.seed)
+            except ImportError:
+                pass
+
+        # Return bullets still in flight to the bullet pool
+        if hasattr(self, 'all_sprites'):
+            self._release_bullets()
+
+        # Create sprite groups
+        self.all_sprites = pygame.sprite.Group()
+        self.player_bullets = pygame.sprite.Group()
+        self.enemy_bullets = pygame.sprite.Group()
+        self.enemies = pygame.sprite.Group()
+        self.explosions = pygame.sprite.Group()
+        self.powerups = pygame.sprite.Group()
+        self.rockets = pygame.sprite.Group()
+
+        # Create player
+        self.player = Player(self.screen_width, self.screen_height, clock=self.clock)
+        self.all_sprites.add(self.player)
+
+        # Add initial powerups for testing
+        self._add_powerup(PowerUp(self.screen_width // 3, 100, "shield"))
+        self._add_powerup(PowerUp(2 * self.screen_width // 3, 100, "rocket"))
+
+        # Create enemy fleet; a fleet prefetched for the old seed is stale
+        self._next_fleet = None
+        self._spawn_fleet()
+
+    def snapshot(self):
+        """
+        Capture the game between two ticks
+
+        Returns:
+            Snapshot: Call restore() on it for an independent copy of this
+                simulation, without timer, recorder or prefetching, or
+                restore(simulation) to overwrite another simulation in place
+        """
+        return Snapshot.capture(self)
+
+    def step(self, inputs=None):
+        """
+        Advance the game by one tick
+
+        Nothing but the pause toggle happens while the game is paused.
+
+        Args:
+            inputs (Inputs, optional): Controls for this tick. No keys are
+                pressed if omitted.
+        """
+        if self.state.game_over:
+            return
+        if inputs is None:
+            inputs = Inputs()
+        if self.recorder is not None:
+            self.recorder.record(inputs)
+        if inputs.pause:
+            self.state.paused = not self.state.paused
+        if self.state.paused:
+            return
+        self.clock.advance()
+
+        self.player.controls = inputs
+        if inputs.fire:
+            self._player_shoot()
+
+        timer = self.timer
+        for name, phase in self.phases:
+            if timer is None:
+                phase()
+            else:
+                start = time.perf_counter()
+                phase()
+                timer.record(name, time.perf_counter() - start)
+        self.ticks += 1
+
+    def _update_sprites(self):
+        # Update all game objects
+        self.all_sprites.update()
+        self.enemy_fleet.update()
+        if self.particles is not None:
+            # Emitting explosions are not in all_sprites
+            self.explosions.update()
+            self.particles.update(self.clock.get_ticks())
+
+    def close(self):
+        """Stop the prefetch worker, if any, and return bullets in flight to the pool"""
+        if self._prefetcher is not None:
+            self._prefetcher.shutdown(cancel_futures=True)
+            self._prefetcher = None
+        self._next_fleet = None
+        self._release_bullets()
+
+    def _release_bullets(self):
+        for bullet in self.player_bullets.sprites() + self.enemy_bullets.sprites():
+            bullet.kill()
+
+    def _build_fleet(self, level, seed):
+        """
+        Build a level's fleet from its own random stream
+
+        The stream is derived from the seed and the level number, and no
+        simulation state is touched, so this can run on the prefetch worker.
+        """
+        formation = self.formation
+        enemy_size = None
+        if self.swarm:
+            formation = swarm_formation(self.swarm, self.screen_width, self.screen_height)
+            enemy_size = SWARM_ENEMY_SIZE
+        return EnemyFleet(self.screen_width, level, rng=random.Random(f"{seed}:{level}"),
+                          backend=self.fleet_backend, screen_height=self.screen_height,
+                          formation=formation, enemy_size=enemy_size)
+
+    def _spawn_fleet(self):
+        """Swap in the enemy fleet for the current level, then prefetch the next one"""
+        start = time.perf_counter()
+        level = self.state.level
+        if self._next_fleet is not None and self._next_fleet[0] == level:
+            # Waits only if the worker has not finished yet
+            self.enemy_fleet = self._next_fleet[1].result()
+        else:
+            self.enemy_fleet = self._build_fleet(level, self.seed)
+        self._next_fleet = None
+
+        # Swarm enemies are moved and drawn in bulk by the fleet
+        if not self.swarm:
+            self.all_sprites.add(self.enemy_fleet.enemies)
+        self.enemies.add(self.enemy_fleet.enemies)
+        self.fire_scheduler.set_fleet(self.enemy_fleet.enemies)
+
+        elapsed = time.perf_counter() - start
+        self.handoff_ms = elapsed * 1000
+        if self.timer is not None:
+            self.timer.record('level_handoff', elapsed)
+
+        if self._prefetcher is not None:
+            self._next_fleet = (level + 1, self._prefetcher.submit(self._build_fleet, level + 1, self.seed))
+
+    def _add_powerup(self, powerup):
+        self.all_sprites.add(powerup)
+        self.powerups.add(powerup)
+
+    def _explosion(self, center, cls=Explosion):
+        """Create an explosion on the simulation clock and random stream"""
+        return self._add_explosion(cls(center, clock=self.clock, rng=self.rng, particles=self.particles))
+
+    def _add_explosion(self, explosion):
+        if explosion.particles is None:
+            self.all_sprites.add(explosion)
+        self.explosions.add(explosion)
+        return explosion
+
+    def _player_shoot(self):
+        bullet = self.player.shoot()
+        if bullet:
+            self.all_sprites.add(bullet)
+            self.player_bullets.add(bullet)
+
+    def _lose_life(self):
+        """Blow up the player and take a life"""
+        self.state.lives -= 1
+        self.stats.deaths[self.state.level] = self.stats.deaths.get(self.state.level, 0) + 1
+        self._explosion(self.player.rect.center)
+        self.player.reset_position()
+        if self.state.lives <= 0:
+            self.state.game_over = True
+
+    def _enemy_fire(self):
+        # Chance increases with level
+        for enemy in self.fire_scheduler.shooters(self.state.level, len(self.enemy_bullets)):
+            bullet = enemy.shoot()
+            if bullet:
+                self.all_sprites.add(bullet)
+                self.enemy_bullets.add(bullet)
+
+    def _spawn_random_powerup(self):
+        # Random power-up spawning (increased probability)
+        if self.rng.random() < 0.01 * self.state.level:  # Much higher chance (10x more frequent)
+            powerup_type = self.rng.choice(["shield", "rocket"])
+            x = self.rng.randint(50, self.screen_width - 50)
+            self._add_powerup(PowerUp(x, 0, powerup_type))
+
+    def _rebuild_grid(self):
+        # Enemies are tested against every bullet, rocket and the player, so
+        # they are indexed at their final position for this tick. Enemy
+        # bullets and power-ups are only tested against the player; indexing
+        # them would cost as much as the single linear scan it replaces.
+        arrays = self.enemy_fleet.arrays
+        if arrays is not None:
+            # The numpy backend buckets the fleet in bulk
+            self.grid.load_buckets(self.enemies, *arrays.cell_buckets(self.grid.cell_size))
+        else:
+            self.grid.rebuild(self.enemies)
+
+    def _collide_bullets_with_enemies(self):
+        hits = self.grid.groupcollide(self.enemies, self.player_bullets, True, True)
+        for hit in hits:
+            self.state.score += 100
+            self.stats.bullet_kills += 1
+            self._explosion(hit.rect.center)
+
+    def _collide_rockets_with_enemies(self):
+        hits = self.grid.groupcollide(self.enemies, self.rockets, False, True)
+        for enemy, rocket_list in hits.items():
+            for rocket in rocket_list:
+                # Create rocket explosion
+                explosion = self._explosion(rocket.explode(), RocketExplosion)
+
+                # Damage all enemies within explosion radius, in one pass
+                # over the grid cells the blast covers
+                targets = self.grid.query_radius(explosion.rect.center, explosion.size / 2, self.enemies)
+                for target in targets:
+                    target.kill()
+                    self.state.score += 100
+                    self.stats.rocket_kills += 1
+                    # Create smaller explosion for each affected enemy
+                    self._explosion(target.rect.center)
+
+    def _collide_enemy_bullets_with_player(self):
+        hits = self.grid.spritecollide(self.player, self.enemy_bullets, True)
+        # A shield simply absorbs the bullets
+        if hits and not self.player.is_shielded():
+            self._lose_life()
+
+    def _collide_enemies_with_player(self):
+        hits = self.grid.spritecollide(self.player, self.enemies, True)
+        if not hits:
+            return
+        if not self.player.is_shielded():
+            self._lose_life()
+        else:
+            # If shield is active, destroy enemies that hit the shield
+            for hit in hits:
+                self._explosion(hit.rect.center)
+                self.state.score += 50
+                self.stats.shield_kills += 1
+
+    def _collect_powerups(self):
+        hits = self.grid.spritecollide(self.player, self.powerups, False)
+        for hit in hits:
+            if hit.powerup_type == "shield":
+                self.player.activate_shield()
+                hit.apply(self.player, self.state)
+                self.stats.shield_pickups += 1
+            elif hit.powerup_type == "rocket":
+                rocket = self.player.fire_rocket()
+                self.all_sprites.add(rocket)
+                self.rockets.add(rocket)
+                hit.apply(self.player, self.state)
+                self.stats.rocket_pickups += 1
+
+    def _advance_level(self):
+        # If all enemies are destroyed, advance to next level
+        if len(self.enemies) == 0:
+            self.state.level += 1
+            self._spawn_fleet()
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Game state snapshots for the Galaxian game
+
+A Snapshot copies out everything a Simulation needs to carry on from the
+tick it was taken at as flat records rather than objects: the GameState and
+event counters, the player's position, shield timer and last shot, each
+enemy's position, speed and dive state, the positions of bullets, rockets
+and power-ups, explosion timers, the live particle rows, the fleet arrays,
+the clock and the random stream states. Enemies and bullets, the bulk of a
+busy game, are packed into integer arrays. Sprite images are not copied;
+the records refer to the shared surfaces, so a snapshot can only be
+restored in the process that took it.
+
+restore() builds an independent Simulation from a snapshot, taking its
+bullets from the shared bullet pool. restore(simulation) overwrites an
+existing simulation instead and reuses its sprites, bullets and particle
+buffer, so a tree search can recycle finished rollouts and a replay can
+seek without allocating new objects.
+
+    python snapshot.py --level 12
+
+measures snapshot size and restore time one second into a level.
+"""
+import argparse
+import gc
+import random
+import time
+from array import array
+
+import pygame
+
+from bullet import bullet_pool, Bullet
+from enemy import Enemy, EnemyFleet
+from explosion import Explosion, RocketExplosion
+from fleet_arrays import FleetArrays
+from particles import ParticleSystem
+from player import Player
+from powerup import PowerUp, Rocket
+
+# Kinds of sprite in all_sprites; a snapshot keeps one code per sprite so
+# the restored group updates and draws in the same order
+PLAYER, ENEMY, PLAYER_BULLET, ENEMY_BULLET, POWERUP, ROCKET, EXPLOSION = range(7)
+_KINDS = {Player: PLAYER, Enemy: ENEMY, PowerUp: POWERUP, Rocket: ROCKET,
+          Explosion: EXPLOSION, RocketExplosion: EXPLOSION}
+
+# Integers per enemy record: x, y, enemy_type, speed_x, speed_y, diving,
+# original_y, dive_target_x, alive
+ENEMY_FIELDS = 9
+
+# Integers per bullet record: center x, bottom, speed
+BULLET_FIELDS = 3
+
+def _blank(cls, spares):
+    """
+    A sprite of class cls to fill in
+
+    A spare sprite is reused if one is left. A new one is built without
+    running its constructor, which would load images, draw from the random
+    streams and play sounds.
+    """
+    if spares:
+        return spares.pop()
+    sprite = cls.__new__(cls)
+    pygame.sprite.Sprite.__init__(sprite)
+    return sprite
+
+def _reclaim(simulation):
+    """
+    Stop a simulation and take its sprites for reuse
+
+    Returns a class -> list mapping of every sprite. Their old groups are
+    dropped wholesale rather than emptied, and bullets stay handed out from
+    the bullet pool.
+    """
+    spares = {Player: [simulation.player], Enemy: list(simulation.enemy_fleet.enemies),
+              Bullet: simulation.player_bullets.sprites() + simulation.enemy_bullets.sprites()}
+    for group in (simulation.powerups, simulation.rockets, simulation.explosions):
+        for sprite in group:
+            spares.setdefault(type(sprite), []).append(sprite)
+    for sprites in spares.values():
+        for sprite in sprites:
+            # Forget every group the sprite was in
+            pygame.sprite.Sprite.__init__(sprite)
+    # Keep close() from releasing the bullets just taken
+    simulation.player_bullets = simulation.enemy_bullets = pygame.sprite.Group()
+    simulation.close()
+    return spares
+
+def _group(sprites):
+    """
+    A sprite group holding sprites, which must not be in it already
+
+    Skips the per-sprite membership and type checks of Group.add().
+    """
+    group = pygame.sprite.Group()
+    group.spritedict.update(dict.fromkeys(sprites))
+    for sprite in sprites:
+        sprite.add_internal(group)
+    return group
+
+def _bullets(records, spares):
+    """Bullets placed per (center x, bottom, speed) record, reusing spares first"""
+    bullets = []
+    records = iter(records)
+    for x, y, speed in zip(*[records] * BULLET_FIELDS):
+        if spares:
+            bullet = spares.pop()
+            bullet.reset(x, y, speed)
+        else:
+            bullet = bullet_pool.acquire(x, y, speed)
+        bullets.append(bullet)
+    return bullets
+
+
+class Snapshot:
+    """
+    A frozen copy of a Simulation between two ticks
+
+    Take one with Simulation.snapshot() or Snapshot.capture(). The
+    simulation's timer, recorder and prefetch worker are not part of it.
+    nbytes is the size of the packed entity records and particle rows.
+    """
+    @classmethod
+    def capture(cls, simulation):
+        """
+        Snapshot a simulation
+
+        Args:
+            simulation (Simulation): Game to capture, between two step() calls
+
+        Returns:
+            Snapshot: The snapshot
+        """
+        self = cls.__new__(cls)
+        self.simulation_class = type(simulation)
+        self.config = {
+            'screen_width': simulation.screen_width,
+            'screen_height': simulation.screen_height,
+            'step_ms': simulation.clock.step_ms,
+            'fleet_backend': simulation.fleet_backend,
+            'max_enemy_bullets': simulation.fire_scheduler.max_bullets,
+            'particles': simulation.use_particles,
+            'prefetch': False,
+            'swarm': simulation.swarm,
+            'formation': simulation.formation,
+        }
+        self.ticks = simulation.ticks
+        self.seed = simulation.seed
+        self.time = simulation.clock.time
+        self.rng = simulation.rng.getstate()
+        self.handoff_ms = simulation.handoff_ms
+
+        state = simulation.state
+        self.state = (state.score, state.level, state.lives, state.game_over, state.paused)
+        stats = simulation.stats
+        self.stats = (stats.bullet_kills, stats.rocket_kills, stats.shield_kills,
+                      stats.shield_pickups, stats.rocket_pickups, dict(stats.deaths))
+
+        player = simulation.player
+        self.player = (player.image, player.original_image, player.shield_image, tuple(player.rect),
+                       player.speed, player.controls, player.screen_width, player.screen_height,
+                       player.shoot_delay, player.last_shot, player.shield_active,
+                       player.shield_time, player.shield_duration)
+
+        # Enemies of a type share their image and chances
+        fleet = simulation.enemy_fleet
+        self.formation = fleet.formation
+        self.enemy_types = {}
+        self.enemies = array('i')
+        for enemy in fleet.enemies:
+            if enemy.enemy_type not in self.enemy_types:
+                self.enemy_types[enemy.enemy_type] = (enemy.image, enemy.rect.width, enemy.rect.height,
+                                                      enemy.dive_chance, enemy.shoot_chance)
+            rect = enemy.rect
+            self.enemies.extend((rect.x, rect.y, enemy.enemy_type, enemy.speed_x, enemy.speed_y,
+                                 enemy.diving, enemy.original_y, getattr(enemy, 'dive_target_x', 0),
+                                 enemy.alive()))
+        self.fleet_rng = fleet.enemies[0].rng.getstate() if fleet.enemies else None
+        self.fleet_arrays = fleet.arrays.getstate() if fleet.arrays is not None else None
+
+        self.player_bullets = array('i')
+        for bullet in simulation.player_bullets:
+            self.player_bullets.extend((bullet.rect.centerx, bullet.rect.bottom, bullet.speed))
+        self.enemy_bullets = array('i')
+        for bullet in simulation.enemy_bullets:
+            self.enemy_bullets.extend((bullet.rect.centerx, bullet.rect.bottom, bullet.speed))
+
+        self.powerups = tuple((powerup.image, tuple(powerup.rect), powerup.powerup_type, powerup.speed,
+                               powerup.glow_size, powerup.glow_direction)
+                              for powerup in simulation.powerups)
+        self.rockets = tuple((rocket.image, tuple(rocket.rect), rocket.speed, rocket.explosion_radius)
+                             for rocket in simulation.rockets)
+        self.explosions = tuple((type(explosion), tuple(explosion.rect), explosion.size,
+                                 explosion.is_rocket, explosion.frame, explosion.frame_rate,
+                                 explosion.last_update, explosion.frame_count, explosion.frames)
+                                for explosion in simulation.explosions)
+
+        particles = simulation.particles
+        self.particles = None
+        if particles is not None:
+            self.particles = (particles.capacity, particles.getstate())
+
+        order = bytearray()
+        for sprite in simulation.all_sprites:
+            kind = _KINDS.get(type(sprite))
+            if kind is None:
+                # Bullets are the only other sprites; their direction tells whose they are
+                kind = PLAYER_BULLET if sprite.speed < 0 else ENEMY_BULLET
+            order.append(kind)
+        self.order = bytes(order)
+
+        self.nbytes = (sum(len(records) * records.itemsize
+                           for records in (self.enemies, self.player_bullets, self.enemy_bullets))
+                       + len(self.order) + (len(self.particles[1][0]) if self.particles else 0))
+        return self
+
+    def restore(self, simulation=None):
+        """
+        Put a simulation in the captured state
+
+        Args:
+            simulation (Simulation, optional): Simulation to overwrite,
+                reusing its sprites, bullets and particle buffer. Its
+                prefetch worker is stopped and its timer and recorder are
+                kept. A new Simulation is built if omitted.
+
+        Returns:
+            Simulation: The restored simulation, independent of the snapshot
+        """
+        # Restoring allocates hundreds of objects and none of them are
+        # garbage yet; collecting partway through only costs time
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._restore(simulation)
+        finally:
+            if enabled:
+                gc.enable()
+
+    def _restore(self, simulation):
+        # Imported here: the simulation module imports this one
+        from simulation import GameState, GameStats
+
+        timer = recorder = particles = None
+        spares = {}
+        if simulation is None:
+            simulation = self.simulation_class.__new__(self.simulation_class)
+        else:
+            timer, recorder, particles = simulation.timer, simulation.recorder, simulation.particles
+            spares = _reclaim(simulation)
+        simulation._configure(**self.config)
+        simulation.timer = timer
+        simulation.recorder = recorder
+
+        simulation.seed = self.seed
+        simulation.ticks = self.ticks
+        simulation.clock.time = self.time
+        simulation.rng.setstate(self.rng)
+        simulation.handoff_ms = self.handoff_ms
+
+        state = simulation.state = GameState()
+        state.score, state.level, state.lives, state.game_over, state.paused = self.state
+        stats = simulation.stats = GameStats()
+        (stats.bullet_kills, stats.rocket_kills, stats.shield_kills, stats.shield_pickups,
+         stats.rocket_pickups, deaths) = self.stats
+        stats.deaths = dict(deaths)
+
+        simulation.particles = None
+        if self.particles is not None:
+            capacity, particle_state = self.particles
+            if particles is None or particles.capacity != capacity:
+                particles = ParticleSystem(capacity, seed=0)
+            particles.setstate(particle_state)
+            simulation.particles = particles
+
+        player = simulation.player = _blank(Player, spares.get(Player))
+        (player.image, player.original_image, player.shield_image, rect, player.speed,
+         player.controls, player.screen_width, player.screen_height, player.shoot_delay,
+         player.last_shot, player.shield_active, player.shield_time,
+         player.shield_duration) = self.player
+        player.rect = pygame.Rect(rect)
+        player.clock = simulation.clock
+
+        enemies, live_enemies = self._restore_fleet(simulation, spares.get(Enemy))
+
+        spare = spares.get(Bullet)
+        player_bullets = _bullets(self.player_bullets, spare)
+        enemy_bullets = _bullets(self.enemy_bullets, spare)
+        for bullet in spare or ():
+            # Back to the pool
+            bullet.kill()
+
+        powerups = []
+        spare = spares.get(PowerUp)
+        for image, rect, powerup_type, speed, glow_size, glow_direction in self.powerups:
+            powerup = _blank(PowerUp, spare)
+            powerup.image = image
+            powerup.rect = pygame.Rect(rect)
+            powerup.powerup_type = powerup_type
+            powerup.speed = speed
+            powerup.glow_size = glow_size
+            powerup.glow_direction = glow_direction
+            powerups.append(powerup)
+
+        rockets = []
+        spare = spares.get(Rocket)
+        for image, rect, speed, explosion_radius in self.rockets:
+            rocket = _blank(Rocket, spare)
+            rocket.image = image
+            rocket.rect = pygame.Rect(rect)
+            rocket.speed = speed
+            rocket.explosion_radius = explosion_radius
+            rockets.append(rocket)
+
+        explosions = []
+        for (explosion_class, rect, size, is_rocket, frame, frame_rate, last_update, frame_count,
+             frames) in self.explosions:
+            explosion = _blank(explosion_class, spares.get(explosion_class))
+            explosion.clock = simulation.clock
+            explosion.rect = pygame.Rect(rect)
+            explosion.size = size
+            explosion.is_rocket = is_rocket
+            explosion.frame = frame
+            explosion.frame_rate = frame_rate
+            explosion.last_update = last_update
+            explosion.frame_count = frame_count
+            explosion.frames = frames
+            explosion.image = frames[frame] if frames else None
+            explosion.particles = simulation.particles
+            explosions.append(explosion)
+
+        # Sprite explosions are the only ones in all_sprites; particle ones
+        # never appear in the order
+        kinds = [iter(sprites) for sprites in ([player], live_enemies, player_bullets, enemy_bullets,
+                                               powerups, rockets, explosions)]
+        simulation.all_sprites = _group([next(kinds[kind]) for kind in self.order])
+        simulation.player_bullets = _group(player_bullets)
+        simulation.enemy_bullets = _group(enemy_bullets)
+        simulation.enemies = _group(live_enemies)
+        simulation.explosions = _group(explosions)
+        simulation.powerups = _group(powerups)
+        simulation.rockets = _group(rockets)
+
+        simulation.fire_scheduler.set_fleet(enemies)
+        return simulation
+
+    def _restore_fleet(self, simulation, spare):
+        """Rebuild the enemy fleet; returns (every enemy, live enemies)"""
+        fleet = simulation.enemy_fleet = EnemyFleet.__new__(EnemyFleet)
+        fleet.formation = self.formation
+        fleet.arrays = None
+        rng = None
+        if self.fleet_rng is not None:
+            # A fixed seed skips the urandom read of Random(); setstate replaces it
+            rng = random.Random(0)
+            rng.setstate(self.fleet_rng)
+
+        enemies = fleet.enemies = []
+        live = []
+        types = self.enemy_types
+        records = iter(self.enemies)
+        for (x, y, enemy_type, speed_x, speed_y, diving, original_y, dive_target_x,
+             alive) in zip(*[records] * ENEMY_FIELDS):
+            enemy = _blank(Enemy, spare)
+            enemy.image, width, height, enemy.dive_chance, enemy.shoot_chance = types[enemy_type]
+            enemy.rect = pygame.Rect(x, y, width, height)
+            enemy.rng = rng
+            enemy.enemy_type = enemy_type
+            enemy.speed_x = speed_x
+            enemy.speed_y = speed_y
+            enemy.diving = bool(diving)
+            enemy.original_y = original_y
+            enemy.dive_target_x = dive_target_x
+            enemy.fleet = enemy.slot = None
+            enemies.append(enemy)
+            if alive:
+                live.append(enemy)
+
+        if self.fleet_arrays is not None:
+            fleet.arrays = FleetArrays.from_state(self.fleet_arrays)
+            fleet.arrays.bind(enemies)
+        return enemies, live
+
+    def fork(self, count):
+        """Restore count independent copies, for example one per rollout"""
+        return [self.restore() for _ in range(count)]
+
+
+def main(argv=None):
+    # Imported here: the simulation module imports this one
+    from simulation import Simulation, Inputs
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--level', type=int, default=1)
+    parser.add_argument('--ticks', type=int, default=60,
+                        help='ticks played before the snapshot')
+    parser.add_argument('--forks', type=int, default=1000)
+    parser.add_argument('--fleet-backend', choices=['sprites', 'numpy'], default='sprites')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    # Fire from the middle of the screen behind a permanent shield, so the
+    # snapshot is of a game still in progress rather than a finished one
+    simulation = Simulation(level=args.level, seed=args.seed, fleet_backend=args.fleet_backend)
+    fire = Inputs(fire=True)
+    for _ in range(args.ticks):
+        if not simulation.player.is_shielded():
+            simulation.player.activate_shield()
+        simulation.step(fire)
+
+    start = time.perf_counter()
+    for _ in range(100):
+        snapshot = simulation.snapshot()
+    captured = (time.perf_counter() - start) / 100
+    start = time.perf_counter()
+    forks = snapshot.fork(args.forks)
+    restored = (time.perf_counter() - start) / args.forks
+
+    # Overwrite one simulation over and over, reusing its sprites
+    target = forks.pop()
+    for fork in forks:
+        fork.close()
+    start = time.perf_counter()
+    for _ in range(args.forks):
+        snapshot.restore(target)
+    reused = (time.perf_counter() - start) / args.forks
+    print(f"Level {simulation.state.level}, tick {snapshot.ticks}: {len(simulation.enemies)} enemies, "
+          f"{len(simulation.enemy_bullets)} enemy bullets, {len(simulation.explosions)} explosions, "
+          f"{simulation.state.lives} lives")
+    print(f"Snapshot: {snapshot.nbytes} bytes in {captured * 1e6:.0f} us; restore: "
+          f"{restored * 1e6:.0f} us per fork ({args.forks} forks), {reused * 1e6:.0f} us into "
+          f"an existing simulation")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Sound bank for the Galaxian game
+
+Every sample is decoded once and played through a managed pool of mixer
+channels instead of being read from disk by each entity that makes a noise.
+"""
+import pygame
+from collections import deque
+
+# name: (path, volume, max concurrent voices); the three shipped samples
+# cover every event, at different volumes where they are shared
+DEFAULT_SAMPLES = {
+    'laser': ('assets/sounds/shoot.wav', 0.4, 4),
+    'shield': ('assets/sounds/powerup.wav', 0.5, 1),
+    'rocket_launch': ('assets/sounds/shoot.wav', 0.6, 2),
+    'explosion': ('assets/sounds/explosion.wav', 0.3, 4),
+    'big_explosion': ('assets/sounds/explosion.wav', 0.6, 2),
+    'powerup': ('assets/sounds/powerup.wav', 0.4, 2),
+}
+
+class SoundBank:
+    """
+    Preloaded samples played through a capped channel pool
+
+    Each sample has a voice limit. Playing a sample that is already at its
+    limit restarts its oldest voice. When the whole pool is busy, the
+    quietest voice is stolen if it is quieter than the new one, otherwise
+    the new sound is dropped.
+    """
+    def __init__(self, num_channels=16):
+        self.num_channels = num_channels
+        self._samples = {}
+        self._sounds = {}
+        self._voices = {}
+        self._channel_volume = {}
+        self.loaded = False
+        self.played = 0
+        self.stolen = 0
+        self.dropped = 0
+
+    def register(self, name, path, volume=1.0, max_voices=4):
+        """
+        Register a sample to be loaded by load_all
+
+        Args:
+            name (str): Name used with play()
+            path (str): Path to the sound file
+            volume (float): Playback volume between 0 and 1
+            max_voices (int): Maximum number of concurrent voices
+        """
+        self._samples[name] = (path, volume, max_voices)
+        self._voices[name] = deque()
+        self.loaded = False
+
+    def load_all(self):
+        """
+        Decode every registered sample once
+
+        Missing files are skipped so that the game runs without them.
+        Does nothing if the mixer is not initialized.
+
+        Returns:
+            int: Number of samples available for playback
+        """
+        if not pygame.mixer.get_init():
+            return 0
+
+        pygame.mixer.set_num_channels(self.num_channels)
+        for name, (path, volume, _) in self._samples.items():
+            if name in self._sounds:
+                continue
+            try:
+                sound = pygame.mixer.Sound(path)
+            except (pygame.error, FileNotFoundError):
+                continue
+            sound.set_volume(volume)
+            self._sounds[name] = sound
+        self.loaded = True
+        return len(self._sounds)
+
+    def play(self, name):
+        """
+        Play a sample on a pooled channel
+
+        Args:
+            name (str): Registered sample name
+
+        Returns:
+            pygame.mixer.Channel: The channel used, or None if nothing played
+        """
+        if not self.loaded:
+            self.load_all()
+        sound = self._sounds.get(name)
+        if sound is None:
+            return None
+
+        _, volume, max_voices = self._samples[name]
+        voices = self._voices[name]
+        while voices and not (voices[0].get_busy() and voices[0].get_sound() is sound):
+            voices.popleft()
+
+        if len(voices) >= max_voices:
+            # Restart the oldest voice of this sample
+            channel = voices.popleft()
+            self.stolen += 1
+        else:
+            channel = pygame.mixer.find_channel()
+            if channel is None:
+                channel = self._quietest_channel(volume)
+                if channel is None:
+                    self.dropped += 1
+                    return None
+                self.stolen += 1
+
+        channel.play(sound)
+        voices.append(channel)
+        self._channel_volume[channel] = volume
+        self.played += 1
+        return channel
+
+    def _quietest_channel(self, volume):
+        """Return the busy channel with the lowest volume below the given one"""
+        quietest = None
+        for channel, channel_volume in self._channel_volume.items():
+            if channel_volume < volume and (quietest is None or channel_volume < self._channel_volume[quietest]):
+                quietest = channel
+        return quietest
+
+    def stats(self):
+        """Return playback counters and the number of loaded samples"""
+        return {
+            'samples': len(self._sounds),
+            'played': self.played,
+            'stolen': self.stolen,
+            'dropped': self.dropped
+        }
+
+
+# Shared by every entity in the process
+sound_bank = SoundBank()
+for _name, (_path, _volume, _max_voices) in DEFAULT_SAMPLES.items():
+    sound_bank.register(_name, _path, _volume, _max_voices)
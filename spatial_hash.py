@@ -0,0 +1,201 @@
+"""
+Spatial hash broadphase for the Galaxian game
+
+A uniform grid over sprite positions, rebuilt once per tick and shared by
+every collision query. The query helpers return exactly what the matching
+pygame.sprite helpers would, in the same order, but only test sprites in
+nearby grid cells instead of every pair.
+"""
+import pygame
+
+class SpatialHash:
+    """
+    Uniform grid of sprites bucketed by the cell holding their rect center
+
+    Each sprite goes into exactly one cell, which keeps rebuild() cheap.
+    Queries widen their search by the largest indexed sprite so that
+    sprites straddling a cell border are still found.
+
+    Queries only return sprites that are still members of the group being
+    asked about, so sprites killed after the rebuild drop out. Indexed
+    sprites must not move between rebuild() and the queries. Groups that
+    were not indexed fall back to the pygame.sprite helpers.
+    """
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self._cells = {}
+        self._groups = set()
+        self._margin_x = 0
+        self._margin_y = 0
+
+    def clear(self):
+        self._cells = {}
+        self._groups.clear()
+        self._margin_x = 0
+        self._margin_y = 0
+
+    def rebuild(self, *groups):
+        """Index every sprite of the given groups, dropping the old index"""
+        self.clear()
+        cells = self._cells
+        size = self.cell_size
+        index = 0
+        max_width = max_height = 0
+        for group in groups:
+            self._groups.add(group)
+            for sprite in group:
+                rect = sprite.rect
+                key = (rect.centerx // size, rect.centery // size)
+                bucket = cells.get(key)
+                if bucket is None:
+                    cells[key] = [(index, sprite)]
+                else:
+                    bucket.append((index, sprite))
+                index += 1
+                if rect.width > max_width:
+                    max_width = rect.width
+                if rect.height > max_height:
+                    max_height = rect.height
+        self._margin_x = max_width // 2 + 1
+        self._margin_y = max_height // 2 + 1
+
+    def load_buckets(self, group, cells, max_width, max_height):
+        """
+        Index one group from precomputed buckets, dropping the old index
+
+        Args:
+            group (pygame.sprite.Group): The group the buckets describe
+            cells: Mapping whose get((cell_x, cell_y)) returns that cell's
+                [(order, sprite), ...] list, or None for an empty cell;
+                order must follow the group's iteration order
+            max_width (int): Widest sprite in the buckets
+            max_height (int): Tallest sprite in the buckets
+        """
+        self.clear()
+        self._groups.add(group)
+        self._cells = cells
+        self._margin_x = max_width // 2 + 1
+        self._margin_y = max_height // 2 + 1
+
+    def is_indexed(self, group):
+        return group in self._groups
+
+    def _query(self, rect, group):
+        """(index, sprite) entries of group members intersecting rect, in order"""
+        size = self.cell_size
+        cells = self._cells
+        x0 = (rect.left - self._margin_x) // size
+        x1 = (rect.right + self._margin_x) // size
+        y0 = (rect.top - self._margin_y) // size
+        y1 = (rect.bottom + self._margin_y) // size
+        colliderect = rect.colliderect
+        hits = []
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                bucket = cells.get((x, y))
+                if bucket:
+                    for entry in bucket:
+                        sprite = entry[1]
+                        if colliderect(sprite.rect) and sprite in group:
+                            hits.append(entry)
+        if len(hits) > 1:
+            hits.sort(key=lambda entry: entry[0])
+        return hits
+
+    def query_rect(self, rect, group):
+        """
+        Find members of an indexed group whose rects intersect rect
+
+        Args:
+            rect (pygame.Rect): Area to test
+            group (pygame.sprite.Group): Only members of this group are returned
+
+        Returns:
+            list: Intersecting sprites in group order
+        """
+        return [sprite for _, sprite in self._query(rect, group)]
+
+    def query_radius(self, center, radius, group):
+        """
+        Find members of a group whose rect centers lie within a circle
+
+        Uses squared distances and, for an indexed group, only visits the
+        cells the circle covers.
+
+        Args:
+            center (tuple): Circle center (x, y)
+            radius (float): Sprites strictly closer than this are returned
+            group (pygame.sprite.Group): Only members of this group are returned
+
+        Returns:
+            list: Sprites in range, in group order
+        """
+        cx, cy = center
+        limit = radius * radius
+        if group not in self._groups:
+            hits = []
+            for sprite in group:
+                x, y = sprite.rect.center
+                if (x - cx) ** 2 + (y - cy) ** 2 < limit:
+                    hits.append(sprite)
+            return hits
+
+        size = self.cell_size
+        cells = self._cells
+        hits = []
+        for x in range(int(cx - radius) // size, int(cx + radius) // size + 1):
+            for y in range(int(cy - radius) // size, int(cy + radius) // size + 1):
+                bucket = cells.get((x, y))
+                if bucket:
+                    for entry in bucket:
+                        sprite = entry[1]
+                        sx, sy = sprite.rect.center
+                        if (sx - cx) ** 2 + (sy - cy) ** 2 < limit and sprite in group:
+                            hits.append(entry)
+        if len(hits) > 1:
+            hits.sort(key=lambda entry: entry[0])
+        return [sprite for _, sprite in hits]
+
+    def spritecollide(self, sprite, group, dokill):
+        """Same as pygame.sprite.spritecollide"""
+        if group not in self._groups:
+            return pygame.sprite.spritecollide(sprite, group, dokill)
+        hits = self.query_rect(sprite.rect, group)
+        if dokill:
+            for hit in hits:
+                hit.kill()
+        return hits
+
+    def groupcollide(self, groupa, groupb, dokilla, dokillb):
+        """
+        Same as pygame.sprite.groupcollide
+
+        When groupa is indexed, groupb is walked once and each of its sprites
+        queries the grid, so the cost grows with len(groupb) and the number of
+        contacts rather than len(groupa) * len(groupb).
+        """
+        if groupa not in self._groups:
+            return pygame.sprite.groupcollide(groupa, groupb, dokilla, dokillb)
+
+        contacts = {}
+        for sprite_b in groupb:
+            for entry in self._query(sprite_b.rect, groupa):
+                contact = contacts.get(entry[1])
+                if contact is None:
+                    contacts[entry[1]] = (entry[0], [sprite_b])
+                else:
+                    contact[1].append(sprite_b)
+
+        # Report in groupa order, as pygame does
+        crashed = {}
+        for sprite_a, (_, collision) in sorted(contacts.items(), key=lambda item: item[1][0]):
+            if dokillb:
+                # Each sprite in groupb only hits the first sprite in groupa
+                collision = [sprite_b for sprite_b in collision if sprite_b in groupb]
+                for sprite_b in collision:
+                    sprite_b.kill()
+            if collision:
+                crashed[sprite_a] = collision
+                if dokilla:
+                    sprite_a.kill()
+        return crashed
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Vectorized environment for the Galaxian game
+
+Runs many independent headless Simulations across a pool of worker
+processes behind a Gym-style reset()/step(actions) API. Workers write
+observations, rewards and done flags straight into shared memory, so a
+step sends only a one-word command to each worker and reads no pickled
+results back. Observations are feature vectors, which skip rendering
+entirely, or rendered frames (see observations.py).
+
+    python vector_env.py --envs 32 --workers 1 2 4 8
+
+measures aggregate steps per second as the pool grows.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only vector environments need it
+    np = None
+
+from simulation import Simulation, Inputs, INPUT_LEFT, INPUT_RIGHT, INPUT_FIRE
+from observations import FeatureObservation, RenderedObservation
+
+# Every combination of the INPUT_* bits
+NUM_ACTIONS = (INPUT_LEFT | INPUT_RIGHT | INPUT_FIRE) + 1
+
+# Observation kind -> class with shape, dtype and observe(simulation, out)
+OBSERVATIONS = {
+    'features': FeatureObservation,
+    'frame': RenderedObservation,
+}
+
+def _make_observer(observation, observation_options, options):
+    """Build the observer for an observation kind, sized to the simulation's screen"""
+    kwargs = {key: options[key] for key in ('screen_width', 'screen_height') if key in options}
+    kwargs.update(observation_options or {})
+    return OBSERVATIONS[observation](**kwargs)
+
+
+def _shared_array(shape, dtype, name=None):
+    """Create (or attach to, by name) a shared memory block viewed as an array"""
+    dtype = np.dtype(dtype)
+    size = max(1, int(np.prod(shape)) * dtype.itemsize)
+    if name is None:
+        block = shared_memory.SharedMemory(create=True, size=size)
+    else:
+        block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+class _Buffers:
+    """Observation, reward, done and action arrays in shared memory"""
+    def __init__(self, num_envs, observation_shape, observation_dtype, names=None):
+        # Name -> (shape of one env's entry, dtype)
+        self.layout = {
+            'observations': (tuple(observation_shape), observation_dtype),
+            'rewards': ((), 'float32'),
+            'dones': ((), 'bool'),
+            'actions': ((), 'uint8'),
+        }
+        self.blocks = {}
+        for key, (row_shape, dtype) in self.layout.items():
+            block, array = _shared_array((num_envs,) + row_shape, dtype, names[key] if names else None)
+            self.blocks[key] = block
+            setattr(self, key, array)
+
+    def names(self):
+        return {key: block.name for key, block in self.blocks.items()}
+
+    def close(self, unlink=False):
+        for key in self.layout:
+            setattr(self, key, None)
+        for block in self.blocks.values():
+            block.close()
+            if unlink:
+                block.unlink()
+        self.blocks = {}
+
+
+def _worker(connection, num_envs, names, first, count, seed, observation, observation_options,
+            options):
+    """Step envs first..first+count-1 on commands from the parent"""
+    observer = _make_observer(observation, observation_options, options)
+    observe = observer.observe
+    buffers = _Buffers(num_envs, observer.shape, observer.dtype, names)
+    envs = range(first, first + count)
+
+    # Each env draws its episode seeds from its own stream
+    seeders = {index: random.Random(f"{seed}:{index}" if seed is not None else None) for index in envs}
+    simulations = {index: Simulation(seed=seeders[index].getrandbits(32), **options) for index in envs}
+    level = options.get('level', 1)
+    try:
+        while True:
+            command = connection.recv()
+            if command == 'step':
+                actions = buffers.actions
+                for index, simulation in simulations.items():
+                    score = simulation.state.score
+                    simulation.step(Inputs.from_bits(int(actions[index])))
+                    buffers.rewards[index] = simulation.state.score - score
+                    done = simulation.state.game_over
+                    buffers.dones[index] = done
+                    if done:
+                        # Auto-reset: the observation is the new episode's first
+                        simulation.reset(level, seeders[index].getrandbits(32))
+                    observe(simulation, buffers.observations[index])
+            elif command == 'reset':
+                for index, simulation in simulations.items():
+                    simulation.reset(level, seeders[index].getrandbits(32))
+                    buffers.rewards[index] = 0
+                    buffers.dones[index] = False
+                    observe(simulation, buffers.observations[index])
+            elif command == 'close':
+                break
+            connection.send(None)
+    finally:
+        for simulation in simulations.values():
+            simulation.close()
+        buffers.close()
+        connection.close()
+
+
+class VectorEnv:
+    """
+    N independent headless games stepped in lock-step by a process pool
+
+    Envs are split into contiguous slices, one per worker. reset() and
+    step() return views of the shared buffers, which the next call
+    overwrites; copy them to keep them.
+
+    An env whose game ends is reset straight away with a fresh seed: its
+    done flag is set for that step and the observation returned is the
+    first one of the new game. Episode seeds are derived from seed and the
+    env index, so a seeded VectorEnv fed the same actions replays exactly.
+
+    observation picks a key of OBSERVATIONS: 'features' (the default)
+    reads a FeatureObservation vector from the sprite groups without
+    rendering, 'frame' draws every tick offscreen and reads the pixels back.
+    observation_options go to the observation class, for example
+    {'downsample': 4, 'grayscale': True} for frames.
+
+    Extra keyword arguments (level, fleet_backend, swarm, ...) are passed
+    to every Simulation.
+    """
+    def __init__(self, num_envs, num_workers=None, seed=None, observation='features',
+                 observation_options=None, **options):
+        if np is None:
+            raise ImportError("vector environments require numpy")
+        self.num_envs = num_envs
+        self.num_workers = max(1, min(num_workers or os.cpu_count() or 1, num_envs))
+        self.steps = 0
+        self.step_seconds = 0.0
+        observer = _make_observer(observation, observation_options, options)
+        self.observation_shape = observer.shape
+        self._buffers = _Buffers(num_envs, observer.shape, observer.dtype)
+        self._connections = []
+        self._processes = []
+
+        base, extra = divmod(num_envs, self.num_workers)
+        first = 0
+        for worker in range(self.num_workers):
+            count = base + (worker < extra)
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker, name=f'galaxian-env-{worker}', daemon=True,
+                args=(child, num_envs, self._buffers.names(), first, count, seed, observation,
+                      observation_options, options))
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+            first += count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _broadcast(self, command):
+        for connection in self._connections:
+            connection.send(command)
+        for connection in self._connections:
+            connection.recv()
+
+    def reset(self):
+        """
+        Start a new game in every env
+
+        Returns:
+            numpy.ndarray: Observations, shape (num_envs,) + observation_shape
+        """
+        self._broadcast('reset')
+        return self._buffers.observations
+
+    def step(self, actions):
+        """
+        Advance every env by one tick
+
+        Args:
+            actions (array-like): One INPUT_* bit mask per env
+
+        Returns:
+            tuple: (observations, rewards, dones). Rewards are score gained
+                this tick; dones are set where the game ended.
+        """
+        start = time.perf_counter()
+        self._buffers.actions[:] = actions
+        self._broadcast('step')
+        self.step_seconds += time.perf_counter() - start
+        self.steps += self.num_envs
+        buffers = self._buffers
+        return buffers.observations, buffers.rewards, buffers.dones
+
+    def steps_per_second(self):
+        """Env steps per second over every step() call so far"""
+        return self.steps / self.step_seconds if self.step_seconds else 0.0
+
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        if not self._processes:
+            return
+        for connection in self._connections:
+            try:
+                connection.send('close')
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+        self._processes = []
+        self._buffers.close(unlink=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--envs', type=int, default=16)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4],
+                        help='pool sizes to measure')
+    parser.add_argument('--steps', type=int, default=500, help='vector steps per measurement')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--fleet-backend', choices=['sprites', 'numpy'], default='sprites')
+    parser.add_argument('--observation', choices=sorted(OBSERVATIONS), default='features')
+    parser.add_argument('--downsample', type=int, default=4, help='frame observations only')
+    parser.add_argument('--grayscale', action='store_true', help='frame observations only')
+    args = parser.parse_args(argv)
+
+    observation_options = None
+    if args.observation == 'frame':
+        observation_options = {'downsample': args.downsample, 'grayscale': args.grayscale}
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{args.envs} envs, {args.steps} steps, {args.observation} observations, "
+          f"{os.cpu_count()} CPUs")
+    for workers in args.workers:
+        with VectorEnv(args.envs, workers, seed=args.seed, observation=args.observation,
+                       observation_options=observation_options,
+                       fleet_backend=args.fleet_backend) as env:
+            env.reset()
+            for _ in range(args.steps):
+                env.step(rng.integers(0, NUM_ACTIONS, size=args.envs))
+            print(f"{env.num_workers:3d} workers  {env.steps_per_second():10.0f} steps/s")
+
+if __name__ == "__main__":
+    main()